@@ -0,0 +1,134 @@
+import hashlib
+import os
+import threading
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable
+
+from playsound import playsound
+
+from api.cambridge import HEADERS, get_audio_url
+from api.session import get, get_session
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class AudioCache:
+    """
+    An on-disk cache of pronunciation clips, keyed by the hash of Cluster.audio_source.
+    The least recently played clips are removed once the cache grows beyond max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.downloads = {}
+
+        # Downloads and playback never run on the caller's thread
+        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.player = ThreadPoolExecutor(max_workers=1)
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Clips left half written by a crash are not counted, nor ever played
+        self.size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory) if not name.endswith(".part"))
+
+    def get_path(self, audio_source: str) -> str:
+        digest = hashlib.sha1(audio_source.encode("utf-8")).hexdigest()
+        ext = os.path.splitext(audio_source)[1] or ".mp3"
+
+        return os.path.join(self.directory, digest + ext)
+
+    def contains(self, audio_source: str) -> bool:
+        return os.path.exists(self.get_path(audio_source))
+
+    def get(self, audio_source: str) -> str:
+        """
+        Return the local path of a clip, downloading it first if it is not cached.
+        Concurrent calls for the same clip share one download.
+        """
+
+        path = self.get_path(audio_source)
+
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+
+        with self.lock:
+            future = self.downloads.get(path)
+            is_owner = future is None
+
+            if is_owner:
+                future = Future()
+                self.downloads[path] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            self.download(audio_source, path)
+            future.set_result(path)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.downloads[path]
+
+        return path
+
+    def download(self, audio_source: str, path: str) -> None:
+        res = get(get_audio_url(audio_source), headers=HEADERS, session=get_session())
+        res.raise_for_status()
+
+        # Write to a temporary file first so that a partial clip is never played
+        temp_path = path + ".part"
+
+        with open(temp_path, "wb") as f:
+            f.write(res.content)
+
+        os.replace(temp_path, path)
+
+        with self.lock:
+            self.size += len(res.content)
+
+        self.evict()
+
+    def evict(self) -> None:
+        with self.lock:
+            if self.size <= self.max_bytes:
+                return
+
+            # Clips still being downloaded are about to be returned to their callers
+            paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if not name.endswith(".part")]
+            paths = [path for path in paths if path not in self.downloads]
+            paths.sort(key=os.path.getmtime)
+
+            for path in paths:
+                if self.size <= self.max_bytes:
+                    break
+
+                self.size -= os.path.getsize(path)
+                os.remove(path)
+
+    def prefetch(self, audio_sources: Iterable[str]) -> None:
+        """
+        Download clips in the background so that playing them later is instant.
+        """
+
+        for audio_source in audio_sources:
+            if audio_source and not self.contains(audio_source):
+                self.executor.submit(self.get, audio_source)
+
+    def play(self, audio_source: str) -> Future:
+        """
+        Play a clip from the cache without blocking. Clips are played one at a time in order.
+        """
+
+        return self.player.submit(lambda: playsound(self.get(audio_source)))
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.player.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,177 @@
+import json
+import sqlite3
+import threading
+import time
+
+from collections import OrderedDict
+
+from models.vocab.dictionary import Vocabulary, vocab_to_rows, vocab_from_rows
+
+DEFAULT_TTL = 7 * 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class LookupCache:
+    """
+    A persistent cache of fetched pages and parsed Vocabulary(s), keyed by (trans, word).
+    Entries expire after ttl seconds and the least recently used ones are evicted beyond max_entries.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        # In-memory LRU of (trans, word) -> (created, Vocabulary), backed by the database
+        self.entries = OrderedDict()
+        self.touched = {}
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS lookups ("
+            "trans TEXT NOT NULL, word TEXT NOT NULL, html TEXT NOT NULL, rows TEXT NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL, PRIMARY KEY (trans, word))"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS lookups_accessed ON lookups (accessed)")
+        self.conn.commit()
+
+        self.size = self.conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.size
+
+    def get(self, word: str, trans: str = "english") -> Vocabulary | None:
+        key = (trans, word)
+        now = time.time()
+
+        with self.lock:
+            if key in self.entries:
+                created, vocab = self.entries[key]
+                self.entries.move_to_end(key)
+            else:
+                row = self.conn.execute("SELECT created, rows FROM lookups WHERE trans = ? AND word = ?", key).fetchone()
+
+                if row is None:
+                    self.misses += 1
+                    return None
+
+                created, vocab = row[0], vocab_from_rows(json.loads(row[1]))
+                self.remember(key, created, vocab)
+
+            if now - created > self.ttl:
+                self.delete(key)
+                self.misses += 1
+                return None
+
+            # Access times are written back lazily on flush
+            self.touched[key] = now
+            self.hits += 1
+
+            return vocab
+
+    def get_html(self, word: str, trans: str = "english") -> str | None:
+        with self.lock:
+            row = self.conn.execute("SELECT html FROM lookups WHERE trans = ? AND word = ?", (trans, word)).fetchone()
+
+        return None if row is None else row[0]
+
+    def put(self, word: str, trans: str, html: str, vocab: Vocabulary) -> None:
+        key = (trans, word)
+        now = time.time()
+        rows = json.dumps(vocab_to_rows(vocab), ensure_ascii=False)
+
+        with self.lock:
+            exists = self.conn.execute("SELECT 1 FROM lookups WHERE trans = ? AND word = ?", key).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO lookups (trans, word, html, rows, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (trans, word, html, rows, now, now)
+            )
+            self.conn.commit()
+
+            self.touched.pop(key, None)
+            self.remember(key, now, vocab)
+
+            if exists is None:
+                self.size += 1
+
+            if self.size > self.max_entries:
+                self.evict(self.size - self.max_entries)
+
+    def remember(self, key: tuple, created: float, vocab: Vocabulary) -> None:
+        self.entries[key] = (created, vocab)
+        self.entries.move_to_end(key)
+
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def delete(self, key: tuple) -> None:
+        """
+        Remove an entry. Expects the lock to be held.
+        """
+
+        self.entries.pop(key, None)
+        self.touched.pop(key, None)
+        cursor = self.conn.execute("DELETE FROM lookups WHERE trans = ? AND word = ?", key)
+        self.conn.commit()
+        self.size -= cursor.rowcount
+
+    def evict(self, count: int) -> None:
+        """
+        Remove the count least recently used entries. Expects the lock to be held.
+        """
+
+        self.write_touched()
+
+        keys = self.conn.execute("SELECT trans, word FROM lookups ORDER BY accessed LIMIT ?", (count, )).fetchall()
+        self.conn.executemany("DELETE FROM lookups WHERE trans = ? AND word = ?", keys)
+        self.conn.commit()
+
+        for key in keys:
+            self.entries.pop(tuple(key), None)
+
+        self.size -= len(keys)
+
+    def expire(self) -> None:
+        """
+        Remove all entries older than ttl.
+        """
+
+        with self.lock:
+            self.conn.execute("DELETE FROM lookups WHERE created < ?", (time.time() - self.ttl, ))
+            self.conn.commit()
+
+            self.entries.clear()
+            self.size = self.conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    def write_touched(self) -> None:
+        self.conn.executemany(
+            "UPDATE lookups SET accessed = ? WHERE trans = ? AND word = ?",
+            [(accessed, trans, word) for (trans, word), accessed in self.touched.items()]
+        )
+        self.conn.commit()
+        self.touched.clear()
+
+    def flush(self) -> None:
+        with self.lock:
+            self.write_touched()
+
+    def clear(self) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM lookups")
+            self.conn.commit()
+
+            self.entries.clear()
+            self.touched.clear()
+            self.size = 0
+
+    def get_stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": self.size}
+
+    def close(self) -> None:
+        self.flush()
+        self.conn.close()
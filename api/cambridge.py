@@ -1,124 +1,295 @@
-import requests
+import os
 import re
 
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, Iterator
+
+import requests
+
 from bs4 import BeautifulSoup
 
+from api.cache import LookupCache
+from api.session import RateLimiter, get, get_session
+from api.streamparser import EntryNotFound, parse_stream
 from models.vocab.dictionary import Cluster, Vocabulary
 
-BASE_URL = "https://dictionary.cambridge.org/"
+DEFAULT_BASE_URL = "https://dictionary.cambridge.org/"
+BASE_URL = os.environ.get("WORDSEA_BASE_URL", DEFAULT_BASE_URL)
+PARSER = "stream"
 HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/119.0"}
 
 
-def fetch(search_word: str, trans: str = "english") -> Vocabulary | None:
+class FetchError(Exception):
     """
-    Fetch and parse info of a word into Vocabulary from Cambridge Dictionary.
+    A failed lookup of a word. kind is one of "network", "http", "not_found" or "parse".
+    """
+
+    def __init__(self, word: str, kind: str, message: str = "", status: int | None = None) -> None:
+        super().__init__("%s: %s %s" % (word, kind, message))
+
+        self.word = word
+        self.kind = kind
+        self.message = message
+        self.status = status
+
+
+class FetchResult:
+    """
+    The outcome of a lookup: vocab on success, error otherwise.
+    """
+
+    def __init__(self, word: str, trans: str, vocab: Vocabulary | None = None, error: FetchError | None = None) -> None:
+        self.word = word
+        self.trans = trans
+        self.vocab = vocab
+        self.error = error
+
+    def __repr__(self) -> str:
+        return "FetchResult(%s, %s)" % (self.word, self.vocab if self.error is None else self.error.kind)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def set_base_url(base_url: str) -> None:
+    """
+    Point lookups and audio at another host, e.g. a local stand-in of Cambridge Dictionary.
+    """
+
+    global BASE_URL
+
+    if not base_url:
+        base_url = DEFAULT_BASE_URL
+
+    if not base_url.endswith("/"):
+        base_url += "/"
+
+    BASE_URL = base_url
+
+
+def get_url(search_word: str, trans: str = "english") -> str:
+    return BASE_URL + "dictionary/" + trans + "/" + search_word
+
+
+def get_audio_url(audio_source: str) -> str:
+    return BASE_URL + audio_source.lstrip("/")
+
+
+def fetch_html(search_word: str, trans: str = "english", session: requests.Session = None, limiter: RateLimiter = None) -> str:
+    """
+    Fetch the raw page of a word from Cambridge Dictionary over a shared keep-alive session.
     """
 
     try:
-        res = requests.get(BASE_URL + "dictionary/" + trans + "/" + search_word, headers=HEADERS)
-        soup = BeautifulSoup(res.text, "html.parser")
+        res = get(get_url(search_word, trans), headers=HEADERS, session=session, limiter=limiter)
+    except requests.RequestException as e:
+        raise FetchError(search_word, "network", str(e))
+
+    if res.status_code == 404:
+        raise FetchError(search_word, "not_found", res.reason, res.status_code)
+
+    if res.status_code >= 400:
+        raise FetchError(search_word, "http", res.reason, res.status_code)
+
+    return res.text
+
+
+def parse_soup(html: str, search_word: str) -> Vocabulary:
+    """
+    Parse a Cambridge Dictionary page into Vocabulary with BeautifulSoup.
+    """
 
-        # Only include definitions from the first dictionary
-        dictionary = soup.find("div", class_="dictionary")
+    soup = BeautifulSoup(html, "html.parser")
 
-        if dictionary is None:
-            dictionary = soup.find("div", class_="entry-body")
+    # Only include definitions from the first dictionary
+    dictionary = soup.find("div", class_="dictionary")
 
-        entries = dictionary.find_all("div", class_="entry-body__el")
-        vocab = Vocabulary(search_word)
+    if dictionary is None:
+        dictionary = soup.find("div", class_="entry-body")
 
-        for entry in entries:
-            word = entry.find("div", class_="di-title").text
+    if dictionary is None:
+        raise EntryNotFound("No entry found for %s" % search_word)
 
-            if word != search_word:
-                vocab.word = word
+    entries = dictionary.find_all("div", class_="entry-body__el")
+    vocab = Vocabulary(search_word)
 
-            pos = entry.find("span", class_="pos dpos").text
-            pronunciation = entry.find("span", class_="pron dpron").text
-            audio = entry.find("audio", class_="hdn")
-            audio_source = audio.find("source").get("src")
+    for entry in entries:
+        word = entry.find("div", class_="di-title").text
 
-            gram = entry.find("span", class_="gram dgram")
+        if word != search_word:
+            vocab.word = word
 
-            if gram is not None:
-                pos += " " + gram.text
+        pos = entry.find("span", class_="pos dpos").text
+        pronunciation = entry.find("span", class_="pron dpron").text
+        audio = entry.find("audio", class_="hdn")
+        audio_source = audio.find("source").get("src")
 
-            meanings = []
-            examples = []
-            synonyms = []
-            antonyms = []
-            related = []
+        gram = entry.find("span", class_="gram dgram")
 
-            xref_synonym = entry.find("div", class_=re.compile("^xref synonym "))
-            xref_synonyms = entry.find("div", class_=re.compile("^xref synonyms "))
-            xref_opposite = entry.find("div", class_=re.compile("^xref opposite "))
-            xref_see = entry.find("div", class_=re.compile("^xref see "))
-            xref_see_also = entry.find("div", class_=re.compile("^xref see_also "))
-            xref_compare = entry.find("div", class_=re.compile("^xref compare "))
-            xref_related = entry.find("div", class_=re.compile("^xref related "))
-            xref_related_word = entry.find("div", class_=re.compile("^xref related_word "))
+        if gram is not None:
+            pos += " " + gram.text
 
-            if xref_synonym != None:
-                syn = xref_synonym.find("span", class_="x-h dx-h")
+        meanings = []
+        examples = []
+        synonyms = []
+        antonyms = []
+        related = []
+
+        xref_synonym = entry.find("div", class_=re.compile("^xref synonym "))
+        xref_synonyms = entry.find("div", class_=re.compile("^xref synonyms "))
+        xref_opposite = entry.find("div", class_=re.compile("^xref opposite "))
+        xref_see = entry.find("div", class_=re.compile("^xref see "))
+        xref_see_also = entry.find("div", class_=re.compile("^xref see_also "))
+        xref_compare = entry.find("div", class_=re.compile("^xref compare "))
+        xref_related = entry.find("div", class_=re.compile("^xref related "))
+        xref_related_word = entry.find("div", class_=re.compile("^xref related_word "))
+
+        if xref_synonym != None:
+            syn = xref_synonym.find("span", class_="x-h dx-h")
+            synonyms.append(syn.text)
+
+        if xref_synonyms != None:
+            syns = xref_synonyms.find_all("span", class_="x-h dx-h")
+
+            for syn in syns:
                 synonyms.append(syn.text)
 
-            if xref_synonyms != None:
-                syns = xref_synonyms.find_all("span", class_="x-h dx-h")
+        if xref_opposite != None:
+            ants = xref_opposite.find_all("span", class_="x-h dx-h")
+
+            for ant in ants:
+                antonyms.append(ant.text)
 
-                for syn in syns:
-                    synonyms.append(syn.text)
+        if xref_see != None:
+            sees = xref_see.find_all("span", class_="x-h dx-h")
 
-            if xref_opposite != None:
-                ants = xref_opposite.find_all("span", class_="x-h dx-h")
+            for see in sees:
+                related.append(see.text)
 
-                for ant in ants:
-                    antonyms.append(ant.text)
+        if xref_see_also != None:
+            see_alsos = xref_see_also.find_all("span", class_="x-h dx-h")
 
-            if xref_see != None:
-                sees = xref_see.find_all("span", class_="x-h dx-h")
+            for see_also in see_alsos:
+                related.append(see_also.text)
 
-                for see in sees:
-                    related.append(see.text)
+        if xref_compare != None:
+            compares = xref_compare.find_all("span", class_="x-h dx-h")
 
-            if xref_see_also != None:
-                see_alsos = xref_see_also.find_all("span", class_="x-h dx-h")
+            for compare in compares:
+                related.append(compare.text)
 
-                for see_also in see_alsos:
-                    related.append(see_also.text)
+        if xref_related != None:
+            rels = xref_related.find_all("span", class_="x-h dx-h")
 
-            if xref_compare != None:
-                compares = xref_compare.find_all("span", class_="x-h dx-h")
+            for rel in rels:
+                related.append(rel.text)
 
-                for compare in compares:
-                    related.append(compare.text)
+        if xref_related_word != None:
+            related_words = xref_related_word.find_all("span", class_="x-h dx-h")
 
-            if xref_related != None:
-                rels = xref_related.find_all("span", class_="x-h dx-h")
+            for related_word in related_words:
+                related.append(related_word.text)
 
-                for rel in rels:
-                    related.append(rel.text)
+        def_blocks = entry.find_all("div", class_=re.compile("^def-block ddef_block"))
 
-            if xref_related_word != None:
-                related_words = xref_related_word.find_all("span", class_="x-h dx-h")
+        for def_block in def_blocks:
+            ddef = def_block.find("div", class_="def ddef_d db")
+            dexamp = def_block.find("div", class_="examp dexamp")
 
-                for related_word in related_words:
-                    related.append(related_word.text)
+            if ddef:
+                meanings.append(ddef.text.lstrip().rstrip(": ").replace("\n", ""))
 
-            def_blocks = entry.find_all("div", class_=re.compile("^def-block ddef_block"))
+            if dexamp:
+                examples.append(dexamp.text.lstrip().rstrip(": ").replace("\n", ""))
 
-            for def_block in def_blocks:
-                ddef = def_block.find("div", class_="def ddef_d db")
-                dexamp = def_block.find("div", class_="examp dexamp")
+        vocab.add_cluster(pos, Cluster(pronunciation, meanings, examples, synonyms, antonyms, related, audio_source))
 
-                if ddef:
-                    meanings.append(ddef.text.lstrip().rstrip(": ").replace("\n", ""))
+    return vocab
 
-                if dexamp:
-                    examples.append(dexamp.text.lstrip().rstrip(": ").replace("\n", ""))
 
-            vocab.add_cluster(pos, Cluster(pronunciation, meanings, examples, synonyms, antonyms, related, audio_source))
+PARSERS = {
+    "soup": parse_soup,
+    "stream": parse_stream
+}
+
+
+def parse(html: str, search_word: str, parser: str | None = None) -> Vocabulary:
+    """
+    Parse a Cambridge Dictionary page into Vocabulary with the given parser backend, PARSER by default.
+    """
+
+    return PARSERS[parser or PARSER](html, search_word)
 
-        return vocab
 
+def fetch(search_word: str, trans: str = "english", cache: LookupCache | None = None) -> Vocabulary | None:
+    """
+    Fetch and parse info of a word into Vocabulary from Cambridge Dictionary.
+    Look up the cache first if given, and store the result in it on a miss.
+    """
+
+    return fetch_result(search_word, trans, cache).vocab
+
+
+def fetch_result(search_word: str, trans: str = "english", cache: LookupCache | None = None, session: requests.Session = None, limiter: RateLimiter = None) -> FetchResult:
+    """
+    Fetch a word like fetch, but report failures as a FetchError instead of None.
+    """
+
+    if cache is not None:
+        vocab = cache.get(search_word, trans)
+
+        if vocab is not None:
+            return FetchResult(search_word, trans, vocab)
+
+    try:
+        html = fetch_html(search_word, trans, session, limiter)
+    except FetchError as e:
+        return FetchResult(search_word, trans, error=e)
+
+    try:
+        vocab = parse(html, search_word)
+    except EntryNotFound as e:
+        return FetchResult(search_word, trans, error=FetchError(search_word, "not_found", str(e)))
     except Exception as e:
-        return None
+        return FetchResult(search_word, trans, error=FetchError(search_word, "parse", repr(e)))
+
+    if cache is not None:
+        cache.put(search_word, trans, html, vocab)
+
+    return FetchResult(search_word, trans, vocab)
+
+
+def fetch_many(words: Iterable[str], trans: str = "english", max_workers: int = 8, rate_limit: float | None = None, cache: LookupCache | None = None) -> Iterator[FetchResult]:
+    """
+    Fetch words concurrently on a thread pool sharing one keep-alive session.
+    Yield a FetchResult for each word as soon as it completes, not in input order.
+    At most rate_limit requests per second are sent to each host, if given.
+    """
+
+    session = get_session(max_workers)
+    limiter = RateLimiter(rate_limit)
+    words = iter(words)
+    pending = set()
+
+    # Keep a bounded window of submitted words so that long word lists are consumed lazily
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for word in words:
+                pending.add(executor.submit(fetch_result, word, trans, cache, session, limiter))
+
+                if len(pending) >= max_workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        yield future.result()
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield future.result()
+
+        finally:
+            for future in pending:
+                future.cancel()
@@ -0,0 +1,97 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Iterable
+
+from api.cache import LookupCache
+from api.cambridge import FetchResult, fetch_result
+from api.session import RateLimiter, get_session
+
+
+class AsyncLookup:
+    """
+    An asyncio lookup engine for Cambridge Dictionary.
+    At most max_concurrency lookups run at once, identical in-flight lookups share one request,
+    and a lookup is dropped once every caller waiting on it has been cancelled.
+    """
+
+    def __init__(self, max_concurrency: int = 8, rate_limit: float | None = None, cache: LookupCache | None = None) -> None:
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.limiter = RateLimiter(rate_limit)
+        self.session = get_session(max_concurrency)
+
+        # Blocking requests run on a private pool so that the event loop is never blocked
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.semaphore = None
+        self.inflight = {}
+        self.waiters = {}
+
+    async def fetch(self, word: str, trans: str = "english") -> FetchResult:
+        key = (trans, word)
+        task = self.inflight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(self.lookup(word, trans))
+            task.add_done_callback(lambda _: self.forget(key, task))
+            self.inflight[key] = task
+            self.waiters[task] = 0
+
+        self.waiters[task] += 1
+
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if not task.done():
+                self.waiters[task] -= 1
+
+                if self.waiters[task] == 0:
+                    task.cancel()
+
+    async def fetch_many(self, words: Iterable[str], trans: str = "english") -> AsyncIterator[FetchResult]:
+        """
+        Yield a FetchResult for each word as soon as it completes, not in input order.
+        """
+
+        tasks = [asyncio.ensure_future(self.fetch(word, trans)) for word in words]
+
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                yield await next_result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def cancel(self, word: str, trans: str = "english") -> bool:
+        """
+        Cancel an in-flight lookup for all of its callers.
+        A lookup still waiting for a thread is never run; one already running finishes in its thread, and its result
+        is dropped.
+        """
+
+        task = self.inflight.get((trans, word))
+
+        if task is None:
+            return False
+
+        return task.cancel()
+
+    async def lookup(self, word: str, trans: str) -> FetchResult:
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self.semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, fetch_result, word, trans, self.cache, self.session, self.limiter)
+
+    def forget(self, key: tuple, task: asyncio.Task) -> None:
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+
+        self.waiters.pop(task, None)
+
+    def close(self) -> None:
+        for task in list(self.inflight.values()):
+            task.cancel()
+
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,195 @@
+"""
+Import a word list or a deck CSV into a Dictionary, fetching missing words in parallel.
+
+Usage: python -m api.importer deck.csv dictionary.csv|dictionary.db [--workers 8] [--rate-limit 10]
+"""
+
+import argparse
+import csv
+import os
+import time
+
+from typing import Callable, Iterable, Iterator
+
+from api.cache import LookupCache
+from api.cambridge import fetch_many
+from models.vocab.database import load_dictionary
+from models.vocab.dictionary import Dictionary, vocab_to_rows, vocab_from_rows
+
+
+class ImportProgress:
+    """
+    The progress of an import, passed to the progress callback.
+    """
+
+    def __init__(self, total: int) -> None:
+        self.total = total
+        self.done = 0
+        self.added = 0
+        self.skipped = 0
+        self.failed = 0
+        self.fetched = 0
+        self.start_time = time.monotonic()
+
+    def __repr__(self) -> str:
+        return "%d/%d words, %d added, %d failed, ETA %.0fs" % (self.done, self.total, self.added, self.failed, self.eta)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start_time
+
+    @property
+    def eta(self) -> float:
+        """
+        Estimated seconds left, from the rate of words fetched in this run.
+        """
+
+        if self.fetched == 0:
+            return 0
+
+        return (self.total - self.done) * self.elapsed / self.fetched
+
+
+def read_words(path: str) -> Iterator[str]:
+    """
+    Stream unique words from a deck CSV (first column) or a plain word list (one per line).
+    """
+
+    seen = set()
+
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            lines = (row[0] for row in csv.reader(f) if row)
+        else:
+            lines = f
+
+        for word in lines:
+            word = word.strip()
+
+            if word != "" and word not in seen:
+                seen.add(word)
+                yield word
+
+
+class DeckImporter:
+    """
+    A resumable import of a word list into a Dictionary.
+    Words already in the Dictionary (or in known) are skipped and the rest are fetched with fetch_many.
+    Every checkpoint_every words, fetched rows and processed words are appended to checkpoint_path,
+    so that an interrupted import restores them and continues with the remaining words.
+    """
+
+    def __init__(self, dict: Dictionary, checkpoint_path: str | None = None, trans: str = "english", max_workers: int = 8, rate_limit: float | None = None, cache: LookupCache | None = None, checkpoint_every: int = 100, callback: Callable[[ImportProgress], None] | None = None, known: Iterable[str] = ()) -> None:
+        self.dict = dict
+        self.checkpoint_path = checkpoint_path
+        self.trans = trans
+        self.max_workers = max_workers
+        self.rate_limit = rate_limit
+        self.cache = cache
+        self.checkpoint_every = checkpoint_every
+        self.callback = callback
+        self.known = set(known)
+
+        self.processed = set()
+        self.pending_rows = []
+        self.is_stopped = False
+
+    def run(self, path: str) -> ImportProgress:
+        self.restore()
+
+        progress = ImportProgress(sum(1 for _ in read_words(path)))
+        results = fetch_many(self.get_missing(path, progress), self.trans, self.max_workers, self.rate_limit, self.cache)
+
+        try:
+            for result in results:
+                progress.done += 1
+                progress.fetched += 1
+
+                if result.ok:
+                    self.dict.add_vocab(result.vocab)
+                    self.pending_rows += vocab_to_rows(result.vocab)
+                    progress.added += 1
+                else:
+                    progress.failed += 1
+
+                # Lookups failing on the network are retried when the import is resumed
+                if result.ok or result.error.kind == "not_found":
+                    self.pending_rows.append([result.word])
+
+                if progress.fetched % self.checkpoint_every == 0:
+                    self.checkpoint()
+
+                if self.callback is not None:
+                    self.callback(progress)
+
+                if self.is_stopped:
+                    break
+        finally:
+            results.close()
+            self.checkpoint()
+
+        return progress
+
+    def stop(self) -> None:
+        self.is_stopped = True
+
+    def get_missing(self, path: str, progress: ImportProgress) -> Iterator[str]:
+        for word in read_words(path):
+            if word in self.processed or word in self.known or word in self.dict:
+                progress.done += 1
+                progress.skipped += 1
+                continue
+
+            yield word
+
+    def restore(self) -> None:
+        """
+        Merge the rows of a previous run from the checkpoint into the Dictionary.
+        """
+
+        if self.checkpoint_path is None or not os.path.exists(self.checkpoint_path):
+            return
+
+        with open(self.checkpoint_path, "r", newline="", encoding="utf-8") as f:
+            for row in csv.reader(f):
+                if len(row) == 1:
+                    self.processed.add(row[0])
+                else:
+                    vocab = self.dict.get_vocab(row[0])
+                    self.dict.add_vocab(vocab_from_rows([row], vocab=vocab))
+
+    def checkpoint(self) -> None:
+        if self.checkpoint_path is None or len(self.pending_rows) == 0:
+            return
+
+        with open(self.checkpoint_path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerows(self.pending_rows)
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.pending_rows.clear()
+
+    def clear_checkpoint(self) -> None:
+        if self.checkpoint_path is not None and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import a word list or deck CSV into a dictionary.")
+    parser.add_argument("deck_path")
+    parser.add_argument("dict_path")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate-limit", type=float, default=None)
+    parser.add_argument("--checkpoint-every", type=int, default=100)
+    args = parser.parse_args()
+
+    dictionary = load_dictionary(args.dict_path)
+
+    importer = DeckImporter(dictionary, args.dict_path + ".import", max_workers=args.workers, rate_limit=args.rate_limit, checkpoint_every=args.checkpoint_every, callback=lambda progress: print("\r%s" % progress, end="", flush=True))
+    importer.run(args.deck_path)
+    print()
+
+    dictionary.save(args.dict_path)
+    importer.clear_checkpoint()
+    dictionary.close()
@@ -0,0 +1,94 @@
+import threading
+import time
+
+from urllib.parse import urlparse
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class RateLimiter:
+    """
+    A per-host rate limiter spacing requests at most rate per second apart.
+    """
+
+    def __init__(self, rate: float | None = None) -> None:
+        self.rate = rate
+        self.next_times = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url: str) -> None:
+        if not self.rate:
+            return
+
+        host = urlparse(url).netloc
+
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_times.get(host, now))
+            self.next_times[host] = slot + 1 / self.rate
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def get_session(pool_size: int = 10) -> requests.Session:
+    """
+    Return the shared keep-alive Session, replacing it by one with a pool of pool_size if its pool is smaller.
+    A replaced Session is left open for the callers still using it, and closed when garbage collected.
+    """
+
+    global _session
+
+    with _session_lock:
+        if _session is None or _session.pool_size < pool_size:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.pool_size = pool_size
+            _session = session
+
+        return _session
+
+
+def get(url: str, headers: dict = None, session: requests.Session = None, limiter: RateLimiter = None, retries: int = 3, backoff: float = 0.5, timeout: float = 10) -> requests.Response:
+    """
+    Send a GET request, retrying throttled, failed and unreachable requests with exponential backoff.
+    """
+
+    if session is None:
+        session = get_session()
+
+    for attempt in range(retries + 1):
+        if limiter is not None:
+            limiter.acquire(url)
+
+        try:
+            res = session.get(url, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == retries:
+                raise
+
+            time.sleep(backoff * 2 ** attempt)
+            continue
+
+        if res.status_code not in RETRY_STATUS or attempt == retries:
+            return res
+
+        # Respect the server's hint when throttled
+        delay = backoff * 2 ** attempt
+        retry_after = res.headers.get("Retry-After", "")
+
+        if retry_after.isdigit():
+            delay = max(delay, int(retry_after))
+
+        time.sleep(delay)
+
+    return res
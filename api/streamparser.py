@@ -0,0 +1,320 @@
+import re
+
+from html.parser import HTMLParser
+
+from models.vocab.dictionary import Cluster, Vocabulary
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link", "menuitem", "meta", "param", "source", "track", "wbr"}
+RAW_TAGS = {"script", "style", "template"}
+
+XREF = re.compile("^xref (synonym|synonyms|opposite|see|see_also|compare|related|related_word) ")
+DEF_BLOCK = re.compile("^def-block ddef_block")
+RELATED_XREFS = ["see", "see_also", "compare", "related", "related_word"]
+
+
+class StopParsing(Exception):
+    pass
+
+
+class EntryNotFound(Exception):
+    """
+    A page holding no dictionary entry for the word looked up.
+    """
+
+
+def discard(items: list, item) -> None:
+    """
+    Remove item from items by identity, as distinct lists may compare equal.
+    """
+
+    for i in range(len(items) - 1, -1, -1):
+        if items[i] is item:
+            del items[i]
+            return
+
+
+class Entry:
+    """
+    The fields of an entry-body__el collected while streaming. Mirrors what parse_soup looks up with find.
+    """
+
+    def __init__(self) -> None:
+        self.title = None
+        self.pos = None
+        self.pronunciation = None
+        self.gram = None
+        self.has_audio = False
+        self.has_source = False
+        self.audio_source = None
+        self.xrefs = {}
+        self.def_blocks = []
+
+
+class CambridgeParser(HTMLParser):
+    """
+    A single-pass parser of Cambridge Dictionary pages.
+    Walks the page once without building a tree and stops as soon as the first dictionary has been read.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+
+        self.stack = []
+        self.raw_depth = 0
+        self.closers = {}
+        self.captures = []
+
+        self.dictionary_state = None
+        self.entry_body_state = None
+        self.active_entries = []
+        self.dictionary_entries = []
+        self.entry_body_entries = []
+
+        # Per active entry: the xref div and def-blocks currently open
+        self.active_xrefs = []
+        self.active_def_blocks = []
+
+    def on_close(self, depth: int, closer) -> None:
+        self.closers.setdefault(depth, []).append(closer)
+
+    def capture(self, depth: int, callback) -> None:
+        parts = []
+        self.captures.append(parts)
+
+        def close():
+            discard(self.captures, parts)
+            callback("".join(parts))
+
+        self.on_close(depth, close)
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        attrs = dict(attrs)
+        cls = " ".join((attrs.get("class") or "").split())
+
+        self.stack.append(tag)
+        depth = len(self.stack)
+
+        if tag in RAW_TAGS:
+            self.raw_depth += 1
+
+        self.open(tag, cls, attrs, depth)
+
+        if tag in VOID_TAGS:
+            self.pop()
+
+    def handle_startendtag(self, tag: str, attrs: list) -> None:
+        self.handle_starttag(tag, attrs)
+
+        if tag not in VOID_TAGS:
+            self.pop()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag not in self.stack:
+            return
+
+        while self.stack[-1] != tag:
+            self.pop()
+
+        self.pop()
+
+    def handle_data(self, data: str) -> None:
+        if self.captures and self.raw_depth == 0:
+            for parts in self.captures:
+                parts.append(data)
+
+    def pop(self) -> None:
+        depth = len(self.stack)
+
+        for close in reversed(self.closers.pop(depth, [])):
+            close()
+
+        if self.stack.pop() in RAW_TAGS:
+            self.raw_depth -= 1
+
+    def open(self, tag: str, cls: str, attrs: dict, depth: int) -> None:
+        classes = cls.split()
+
+        if tag == "div":
+            if self.dictionary_state is None and "dictionary" in classes:
+                self.dictionary_state = "open"
+                self.on_close(depth, self.close_dictionary)
+
+            if self.entry_body_state is None and "entry-body" in classes:
+                self.entry_body_state = "open"
+                self.on_close(depth, self.close_entry_body)
+
+            if "entry-body__el" in classes and (self.dictionary_state == "open" or self.entry_body_state == "open"):
+                self.open_entry(depth)
+
+        for entry, xrefs, def_blocks in zip(self.active_entries, self.active_xrefs, self.active_def_blocks):
+            self.open_in_entry(entry, xrefs, def_blocks, tag, cls, classes, attrs, depth)
+
+    def open_entry(self, depth: int) -> None:
+        entry = Entry()
+
+        if self.dictionary_state == "open":
+            self.dictionary_entries.append(entry)
+
+        if self.entry_body_state == "open":
+            self.entry_body_entries.append(entry)
+
+        xrefs = []
+        def_blocks = []
+        self.active_entries.append(entry)
+        self.active_xrefs.append(xrefs)
+        self.active_def_blocks.append(def_blocks)
+
+        def close():
+            discard(self.active_entries, entry)
+            discard(self.active_xrefs, xrefs)
+            discard(self.active_def_blocks, def_blocks)
+
+        self.on_close(depth, close)
+
+    def open_in_entry(self, entry: Entry, xrefs: list, def_blocks: list, tag: str, cls: str, classes: list, attrs: dict, depth: int) -> None:
+        if tag == "div":
+            if entry.title is None and "di-title" in classes:
+                entry.title = ""
+                self.capture(depth, lambda text: setattr(entry, "title", text))
+
+            match = XREF.search(cls)
+
+            if match is not None and match.group(1) not in entry.xrefs:
+                self.open_xref(entry, xrefs, match.group(1), depth)
+
+            if DEF_BLOCK.search(cls):
+                self.open_def_block(entry, def_blocks, depth)
+
+            for def_block in def_blocks:
+                if def_block[0] is None and cls == "def ddef_d db":
+                    def_block[0] = ""
+                    self.capture(depth, lambda text, def_block=def_block: def_block.__setitem__(0, text))
+
+                if def_block[1] is None and cls == "examp dexamp":
+                    def_block[1] = ""
+                    self.capture(depth, lambda text, def_block=def_block: def_block.__setitem__(1, text))
+
+        elif tag == "span":
+            if entry.pos is None and cls == "pos dpos":
+                entry.pos = ""
+                self.capture(depth, lambda text: setattr(entry, "pos", text))
+
+            if entry.pronunciation is None and cls == "pron dpron":
+                entry.pronunciation = ""
+                self.capture(depth, lambda text: setattr(entry, "pronunciation", text))
+
+            if entry.gram is None and cls == "gram dgram":
+                entry.gram = ""
+                self.capture(depth, lambda text: setattr(entry, "gram", text))
+
+            if cls == "x-h dx-h":
+                for kind, texts in xrefs:
+                    if kind != "synonym" or len(texts) == 0:
+                        texts.append("")
+                        self.capture(depth, lambda text, texts=texts, i=len(texts) - 1: texts.__setitem__(i, text))
+
+        elif tag == "audio":
+            if not entry.has_audio and "hdn" in classes:
+                entry.has_audio = True
+                self.on_close(depth, lambda: setattr(entry, "has_audio", "closed"))
+
+        elif tag == "source":
+            if entry.has_audio is True and not entry.has_source:
+                entry.has_source = True
+                entry.audio_source = attrs.get("src")
+
+    def open_xref(self, entry: Entry, xrefs: list, kind: str, depth: int) -> None:
+        texts = []
+        entry.xrefs[kind] = texts
+        xref = (kind, texts)
+        xrefs.append(xref)
+        self.on_close(depth, lambda: discard(xrefs, xref))
+
+    def open_def_block(self, entry: Entry, def_blocks: list, depth: int) -> None:
+        # [meaning, example], None until the first matching div is seen
+        def_block = [None, None]
+        entry.def_blocks.append(def_block)
+        def_blocks.append(def_block)
+        self.on_close(depth, lambda: discard(def_blocks, def_block))
+
+    def close_dictionary(self) -> None:
+        self.dictionary_state = "closed"
+
+        # Only definitions from the first dictionary are used, so the rest of the page can be skipped
+        raise StopParsing()
+
+    def close_entry_body(self) -> None:
+        self.entry_body_state = "closed"
+
+    def get_entries(self) -> list[Entry]:
+        if self.dictionary_state is not None:
+            return self.dictionary_entries
+
+        if self.entry_body_state is not None:
+            return self.entry_body_entries
+
+        return None
+
+
+def clean(text: str) -> str:
+    return text.lstrip().rstrip(": ").replace("\n", "")
+
+
+def parse_stream(html: str, search_word: str) -> Vocabulary:
+    """
+    Parse a Cambridge Dictionary page into Vocabulary in a single pass. Produce the same output as parse_soup.
+    """
+
+    parser = CambridgeParser()
+
+    try:
+        parser.feed(html)
+        parser.close()
+    except StopParsing:
+        pass
+
+    entries = parser.get_entries()
+
+    if entries is None:
+        raise EntryNotFound("No entry found for %s" % search_word)
+
+    vocab = Vocabulary(search_word)
+
+    for entry in entries:
+        if entry.title is None or entry.pos is None or entry.pronunciation is None:
+            raise AttributeError("Incomplete entry for %s" % search_word)
+
+        if not entry.has_audio or not entry.has_source:
+            raise AttributeError("Missing audio for %s" % search_word)
+
+        if entry.title != search_word:
+            vocab.word = entry.title
+
+        pos = entry.pos
+
+        if entry.gram is not None:
+            pos += " " + entry.gram
+
+        if entry.xrefs.get("synonym") == []:
+            raise AttributeError("Empty synonym for %s" % search_word)
+
+        synonyms = entry.xrefs.get("synonym", []) + entry.xrefs.get("synonyms", [])
+        antonyms = list(entry.xrefs.get("opposite", []))
+        related = []
+
+        for kind in RELATED_XREFS:
+            related += entry.xrefs.get(kind, [])
+
+        meanings = []
+        examples = []
+
+        for meaning, example in entry.def_blocks:
+            if meaning is not None:
+                meanings.append(clean(meaning))
+
+            if example is not None:
+                examples.append(clean(example))
+
+        vocab.add_cluster(pos, Cluster(entry.pronunciation, meanings, examples, synonyms, antonyms, related, entry.audio_source))
+
+    return vocab
@@ -9,6 +9,8 @@ OS_PATH = os.path.dirname(__file__)
 DATA_DIR = OS_PATH + "\\data"
 DICT_PATH = DATA_DIR + "\\dictionary.csv"
 SETTINGS_PATH = DATA_DIR + "\\settings.csv"
+CACHE_PATH = DATA_DIR + "\\cache.db"
+AUDIO_DIR = DATA_DIR + "\\audio"
 
 
 if __name__ == "__main__":
@@ -16,7 +18,7 @@ if __name__ == "__main__":
         os.mkdir(DATA_DIR)
 
     app = QApplication(sys.argv)
-    controller = WindowController(DICT_PATH, SETTINGS_PATH)
+    controller = WindowController(DICT_PATH, SETTINGS_PATH, CACHE_PATH, AUDIO_DIR)
     controller.create_window("dict")
 
     sys.exit(app.exec_())
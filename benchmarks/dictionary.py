@@ -0,0 +1,150 @@
+"""
+Benchmark Dictionary prefix queries and index updates on large synthetic dictionaries.
+
+Compares get_vocabs_by_prefix on the sorted word index against the previous approach of listing
+and bisecting the dict keys on every call, the startup time of a CSV Dictionary against a LazyDictionary, and a full save against a journaled save.
+
+Usage: python -m benchmarks.dictionary [size ...]
+"""
+
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+
+from models.vocab.dictionary import Dictionary
+from models.vocab.journal import JournalDictionary
+from models.vocab.lazy import LazyDictionary
+from models.vocab.vocabulary import Cluster, Vocabulary
+from utils.search import bisect_left
+
+
+def make_words(size: int, seed: int = 0) -> list[str]:
+    rand = random.Random(seed)
+    words = set()
+
+    while len(words) < size:
+        words.add("".join(rand.choices(string.ascii_lowercase, k=rand.randint(3, 12))))
+
+    return list(words)
+
+
+def prefix_by_keys(dict: Dictionary, prefix: str) -> list[Vocabulary]:
+    words = list(dict.vocabs.keys())
+    left = bisect_left(words, prefix)
+    right = bisect_left(words, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+    return [dict.vocabs[word] for word in words[left:right]]
+
+
+def timeit(func, *args, repeat: int = 20) -> float:
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        func(*args)
+
+    return (time.perf_counter() - start) / repeat
+
+
+def run_load(size: int) -> None:
+    dictionary = Dictionary()
+
+    for word in make_words(size):
+        vocab = Vocabulary(word)
+        vocab.add_cluster("noun", Cluster("/%s/" % word, ["the meaning of %s" % word, "another meaning"], ["an example of %s." % word], [word + "s"], [], [], "media/%s.mp3" % word))
+        vocab.add_cluster("verb", Cluster("/%s/" % word, ["to %s" % word], [], [], [], [], ""))
+        dictionary.add_vocab(vocab)
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+
+    try:
+        dictionary.to_csv(path)
+
+        start = time.perf_counter()
+        eager = Dictionary()
+        eager.from_csv(path)
+        eager_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        lazy = LazyDictionary(path)
+        lazy_time = time.perf_counter() - start
+
+        words = lazy.get_words()[::max(1, size // 100)]
+        start = time.perf_counter()
+
+        for word in words:
+            lazy.get_vocab(word)
+
+        lookup_time = (time.perf_counter() - start) / len(words)
+        lazy.close()
+
+        journaled = JournalDictionary(path)
+        vocab = journaled.get_vocab(words[0])
+
+        start = time.perf_counter()
+        journaled.to_csv(path)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        journaled.update_vocab(vocab)
+        journaled.save(path)
+        journal_time = time.perf_counter() - start
+        journaled.close()
+
+        print("  load %.2f MB: from_csv %.3f s, LazyDictionary %.3f s, first get_vocab %.3f ms" % (os.path.getsize(path) / 2 ** 20, eager_time, lazy_time, lookup_time * 1000))
+        print("  save one change: to_csv %.3f s, journaled %.3f ms" % (full_time, journal_time * 1000))
+    finally:
+        for leftover in (path, path + ".journal"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+
+def run(sizes: list[int]) -> None:
+    for size in sizes:
+        words = make_words(size)
+        dictionary = Dictionary()
+
+        start = time.perf_counter()
+
+        for word in sorted(words):
+            dictionary.add_vocab(Vocabulary(word))
+
+        load_time = time.perf_counter() - start
+        prefixes = ["a", "ab", "abc", "qzx"]
+
+        print("%d words, loaded in order in %.2f s" % (size, load_time))
+
+        for prefix in prefixes:
+            indexed = timeit(dictionary.get_vocabs_by_prefix, prefix)
+            by_keys = timeit(prefix_by_keys, dictionary, prefix, repeat=3)
+            count = len(dictionary.get_vocabs_by_prefix(prefix))
+
+            print("  prefix %-5s %7d hits  index %9.3f ms  list(keys) %9.3f ms" % (repr(prefix), count, indexed * 1000, by_keys * 1000))
+
+        # Random updates on a full index
+        extra = make_words(1000, seed=1)
+        extra = [word + "_" for word in extra]
+
+        start = time.perf_counter()
+
+        for word in extra:
+            dictionary.add_vocab(Vocabulary(word))
+
+        add_time = (time.perf_counter() - start) / len(extra)
+        start = time.perf_counter()
+
+        for word in extra:
+            dictionary.remove_word(word)
+
+        remove_time = (time.perf_counter() - start) / len(extra)
+
+        print("  add_vocab %.3f ms, remove_word %.3f ms (random position)" % (add_time * 1000, remove_time * 1000))
+
+        run_load(size)
+
+
+if __name__ == "__main__":
+    run([int(size) for size in sys.argv[1:]] or [100000, 1000000])
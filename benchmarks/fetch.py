@@ -0,0 +1,67 @@
+"""
+Benchmark lookup throughput against the local stand-in server.
+
+Runs fetch one word at a time, then fetch_many with a growing number of workers, over the page corpus,
+then loads pronunciation clips through a cold and a warm AudioCache.
+
+Usage: python -m benchmarks.fetch [latency] [rate_limit]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from api import cambridge
+from api.audio import AudioCache
+from benchmarks.parse import PAGE_DIR
+from benchmarks.server import StandInServer
+
+
+def get_words() -> list[str]:
+    return [os.path.splitext(file_name)[0] for file_name in sorted(os.listdir(PAGE_DIR))]
+
+
+def run(latency: float = 0.05, rate_limit: float | None = None) -> None:
+    server = StandInServer(latency=latency).start()
+    cambridge.set_base_url(server.base_url)
+    words = get_words()
+
+    print("%d words, %.0f ms latency, rate limit %s" % (len(words), latency * 1000, rate_limit))
+
+    start = time.perf_counter()
+
+    for word in words:
+        cambridge.fetch(word)
+
+    elapsed = time.perf_counter() - start
+    print("%-16s %8.1f words/s" % ("fetch", len(words) / elapsed))
+
+    for max_workers in [1, 2, 4, 8, 16, 32]:
+        start = time.perf_counter()
+        errors = sum(not result.ok for result in cambridge.fetch_many(words, max_workers=max_workers, rate_limit=rate_limit))
+        elapsed = time.perf_counter() - start
+
+        print("%-16s %8.1f words/s  %d errors" % ("fetch_many x%d" % max_workers, len(words) / elapsed, errors))
+
+    audio_sources = ["/media/english/uk_pron/%s.mp3" % word for word in words]
+
+    with tempfile.TemporaryDirectory() as directory:
+        audio = AudioCache(directory)
+
+        for label in ["audio cold", "audio warm"]:
+            start = time.perf_counter()
+
+            for audio_source in audio_sources:
+                audio.get(audio_source)
+
+            elapsed = time.perf_counter() - start
+            print("%-16s %8.3f ms/clip" % (label, elapsed / len(audio_sources) * 1000))
+
+        audio.close()
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    run(*map(float, sys.argv[1:]))
@@ -0,0 +1,95 @@
+"""
+Benchmark FlashCard on large synthetic decks.
+
+Reports the time to open and reopen a session, the time per card to pick the next card and answer it, half of the
+answers being wrong, both by schedule and with weighted sampling, and the time to aggregate the review log.
+Compared against drawing the next card with random.choice over a list of the cards in learning,
+as done before review states were kept.
+
+Usage: python -m benchmarks.flashcard [size ...]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.dictionary import make_words
+from models.vocab.dictionary import Dictionary
+from models.vocab.flashcard import FlashCard
+from models.vocab.vocabulary import Cluster, Vocabulary
+
+
+def answer(flashcard: FlashCard, answers: int, rand: random.Random) -> float:
+    start = time.perf_counter()
+
+    for _ in range(answers):
+        vocab = flashcard.get_next_vocab()
+
+        if rand.random() < 0.5:
+            flashcard.learn(vocab)
+        else:
+            flashcard.unlearn(vocab)
+
+    return (time.perf_counter() - start) / answers * 1000
+
+
+def run(sizes: list[int], answers: int = 2000) -> None:
+    rand = random.Random(0)
+
+    for size in sizes:
+        dictionary = Dictionary()
+
+        for word in sorted(make_words(size)):
+            vocab = Vocabulary(word)
+            vocab.add_cluster("noun", Cluster("", ["meaning"], ["example"]))
+            dictionary.add_vocab(vocab)
+
+        path = os.path.join(tempfile.mkdtemp(), "dict.csv.reviewlog")
+
+        start = time.perf_counter()
+        flashcard = FlashCard(dictionary, path)
+        open_time = time.perf_counter() - start
+
+        answer_time = answer(flashcard, answers, rand)
+
+        start = time.perf_counter()
+        flashcard.close()
+        close_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        flashcard = FlashCard(dictionary, path)
+        reopen_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        flashcard.log.get_retention()
+        flashcard.log.get_reviews_per_day()
+        history_time = time.perf_counter() - start
+        flashcard.close()
+
+        start = time.perf_counter()
+        flashcard = FlashCard(dictionary, weighted=True)
+        weighted_open_time = time.perf_counter() - start
+        weighted_time = answer(flashcard, answers, rand)
+
+        learning = set(dictionary.get_vocabs())
+        start = time.perf_counter()
+
+        for _ in range(answers):
+            vocab = rand.choice(list(learning))
+
+            if rand.random() < 0.5:
+                learning.discard(vocab)
+
+        choice_time = (time.perf_counter() - start) / answers * 1000
+
+        print("%d words, session opened in %.3f s, closed in %.3f s, reopened from %d logged answers in %.3f s" % (size, open_time, close_time, answers, reopen_time))
+        print("  retention and reviews per day from the log in %.3f s" % history_time)
+        print("  next card and answer %.4f ms" % answer_time)
+        print("  weighted sampling opened in %.3f s, next card and answer %.4f ms" % (weighted_open_time, weighted_time))
+        print("  random.choice over learning %.4f ms" % choice_time)
+
+
+if __name__ == "__main__":
+    run([int(size) for size in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,78 @@
+"""
+Benchmark Dictionary.search_text on synthetic dictionaries of growing size.
+
+Meanings and examples are drawn from a Zipf-distributed vocabulary, as in natural text, without its STOP_RANKS most
+common words which are stop words and not indexed. Queries are a few words taken from the meaning of a random saved word.
+Compared against scanning the text of every word for the query terms, without any ranking.
+
+Usage: python -m benchmarks.fulltext [size ...]
+"""
+
+import bisect
+import itertools
+import random
+import sys
+import time
+
+from benchmarks.dictionary import make_words
+from models.vocab.dictionary import Dictionary, vocab_to_text
+from models.vocab.vocabulary import Cluster, Vocabulary
+
+TERMS = 50000
+STOP_RANKS = 50
+
+
+def make_sampler(rand: random.Random):
+    terms = make_words(TERMS, seed=2)
+    weights = list(itertools.accumulate(1 / rank for rank in range(STOP_RANKS + 1, STOP_RANKS + TERMS + 1)))
+
+    def sample(count: int) -> str:
+        return " ".join(terms[bisect.bisect(weights, rand.random() * weights[-1])] for _ in range(count))
+
+    return sample
+
+
+def run(sizes: list[int], queries: int = 200) -> None:
+    rand = random.Random(0)
+    sample = make_sampler(rand)
+
+    for size in sizes:
+        dictionary = Dictionary()
+
+        for word in sorted(make_words(size)):
+            vocab = Vocabulary(word)
+            vocab.add_cluster("noun", Cluster("", [sample(8), sample(6)], [sample(12)]))
+            dictionary.add_vocab(vocab)
+
+        start = time.perf_counter()
+        dictionary.search_text("warmup")
+        build_time = time.perf_counter() - start
+
+        texts = [vocab_to_text(vocab) for vocab in dictionary.get_vocabs()]
+        targets = rand.sample(dictionary.get_words(), queries)
+        times = []
+        scan_times = []
+        found = 0
+
+        for target in targets:
+            meaning = dictionary.get_vocab(target).get_cluster("noun").meanings[0].split()
+            query = " ".join(rand.sample(meaning, 4))
+
+            start = time.perf_counter()
+            results = dictionary.search_text(query)
+            times.append(time.perf_counter() - start)
+
+            found += target in results
+
+            start = time.perf_counter()
+            terms = query.split()
+            [text for text in texts if any(term in text for term in terms)]
+            scan_times.append(time.perf_counter() - start)
+
+        print("%d words, index built in %.2f s" % (size, build_time))
+        print("  search_text mean %.3f ms, max %.3f ms, target in top 10 for %d/%d queries" % (sum(times) / len(times) * 1000, max(times) * 1000, found, queries))
+        print("  scan mean %.3f ms" % (sum(scan_times) / len(scan_times) * 1000))
+
+
+if __name__ == "__main__":
+    run([int(size) for size in sys.argv[1:]] or [10000, 100000])
@@ -0,0 +1,66 @@
+"""
+Benchmark "did you mean" suggestions of Dictionary.suggest on large synthetic dictionaries.
+
+Queries are saved words with one or two random typos (substitution, deletion, insertion or transposition).
+Reports the time to build the index, the mean and worst query time, and how often the original word is suggested.
+
+Usage: python -m benchmarks.fuzzy [size ...]
+"""
+
+import random
+import string
+import sys
+import time
+
+from benchmarks.dictionary import make_words
+from models.vocab.dictionary import Dictionary
+from models.vocab.vocabulary import Vocabulary
+
+
+def add_typo(word: str, rand: random.Random) -> str:
+    i = rand.randrange(len(word))
+    op = rand.randrange(4)
+
+    if op == 0:
+        return word[:i] + rand.choice(string.ascii_lowercase) + word[i + 1:]
+    elif op == 1:
+        return word[:i] + word[i + 1:]
+    elif op == 2:
+        return word[:i] + rand.choice(string.ascii_lowercase) + word[i:]
+    elif i < len(word) - 1:
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+    return word + rand.choice(string.ascii_lowercase)
+
+
+def run(sizes: list[int], queries: int = 200) -> None:
+    rand = random.Random(0)
+
+    for size in sizes:
+        dictionary = Dictionary()
+
+        for word in sorted(make_words(size)):
+            dictionary.add_vocab(Vocabulary(word))
+
+        start = time.perf_counter()
+        dictionary.suggest("warmup")
+        build_time = time.perf_counter() - start
+
+        originals = rand.sample(dictionary.get_words(), queries)
+        typos = [add_typo(word, rand) if rand.random() < 0.5 else add_typo(add_typo(word, rand), rand) for word in originals]
+        times = []
+        found = 0
+
+        for original, typo in zip(originals, typos):
+            start = time.perf_counter()
+            suggestions = dictionary.suggest(typo)
+            times.append(time.perf_counter() - start)
+
+            found += original in suggestions
+
+        print("%d words, index built in %.2f s" % (size, build_time))
+        print("  suggest mean %.3f ms, max %.3f ms, original word suggested for %d/%d typos" % (sum(times) / len(times) * 1000, max(times) * 1000, found, queries))
+
+
+if __name__ == "__main__":
+    run([int(size) for size in sys.argv[1:]] or [100000, 1000000])
@@ -0,0 +1,75 @@
+"""
+Benchmark the word graph of Dictionary.get_word_graph on large synthetic dictionaries.
+
+Each saved word lists a few synonyms, antonyms and related words, drawn with a bias towards a core of common words
+as in real thesauri. Reports build time, 2-hop neighborhood, shortest path and word family query times,
+and the cost of updating the graph on add_vocab and remove_word.
+Word family queries return whole components, so their time follows the size of the family.
+
+Usage: python -m benchmarks.graph [size ...]
+"""
+
+import random
+import sys
+import time
+
+from benchmarks.dictionary import make_words
+from models.vocab.dictionary import Dictionary
+from models.vocab.vocabulary import Cluster, Vocabulary
+
+
+def make_vocab(word: str, words: list[str], rand: random.Random) -> Vocabulary:
+    def pick(count: int) -> list[str]:
+        # Half of the links go to the first tenth of the words
+        return [words[int(rand.random() * len(words) * (0.1 if rand.random() < 0.5 else 1))] for _ in range(count)]
+
+    vocab = Vocabulary(word)
+    vocab.add_cluster("adjective", Cluster("", [""], [""], pick(rand.randint(0, 4)), pick(rand.randint(0, 1)), pick(rand.randint(0, 2))))
+
+    return vocab
+
+
+def timeit(func, args_list: list[tuple]) -> float:
+    start = time.perf_counter()
+
+    for args in args_list:
+        func(*args)
+
+    return (time.perf_counter() - start) / len(args_list) * 1000
+
+
+def run(sizes: list[int], queries: int = 200) -> None:
+    rand = random.Random(0)
+
+    for size in sizes:
+        words = sorted(make_words(size))
+        dictionary = Dictionary()
+
+        for word in words:
+            dictionary.add_vocab(make_vocab(word, words, rand))
+
+        start = time.perf_counter()
+        graph = dictionary.get_word_graph()
+        build_time = time.perf_counter() - start
+
+        pairs = [(rand.choice(words), rand.choice(words)) for _ in range(queries)]
+        sizes_2hop = [len(graph.get_neighbors(word, 2)) for word, _ in pairs]
+
+        print("%d words, graph of %d nodes built in %.2f s" % (size, len(graph), build_time))
+        print("  2-hop neighbors %.3f ms (%.0f words on average)" % (timeit(graph.get_neighbors, [(word, 2) for word, _ in pairs]), sum(sizes_2hop) / len(sizes_2hop)))
+        print("  shortest path %.3f ms" % timeit(graph.get_path, pairs))
+
+        start = time.perf_counter()
+        families = graph.get_families()
+        print("  components computed in %.2f s, largest family %d words" % (time.perf_counter() - start, len(families[0])))
+        print("  word family %.3f ms" % timeit(graph.get_family, [(word, ) for word, _ in pairs]))
+
+        updates = [(make_vocab(word, words, rand), ) for word, _ in pairs]
+        print("  add_vocab %.3f ms, remove_word %.3f ms" % (timeit(dictionary.add_vocab, updates), timeit(dictionary.remove_word, [(vocab.word, ) for vocab, in updates])))
+
+        # A removal may split a family, which is recomputed on its next query
+        print("  word family after removals %.3f ms" % timeit(graph.get_family, [(word, ) for word, _ in pairs if word in graph]))
+
+
+if __name__ == "__main__":
+    run([int(size) for size in sys.argv[1:]] or [100000])
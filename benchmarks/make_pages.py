@@ -0,0 +1,189 @@
+"""
+Generate a corpus of dictionary pages in Cambridge Dictionary markup from a deck CSV.
+
+The pages reproduce the structure parsed by api/cambridge.py: a first "dictionary" section with one
+entry-body__el per part of speech, a second dictionary that must be ignored, xref blocks for synonyms,
+antonyms and related words, and the page chrome (scripts, navigation, footer) around them.
+Every fourth page omits the dictionary wrapper to exercise the entry-body fallback.
+
+Usage: python -m benchmarks.make_pages [deck.csv] [out_dir]
+"""
+
+import csv
+import html
+import os
+import sys
+
+DECK_PATH = os.path.join("data", "Magoosh GRE", "Basic I.csv")
+OUT_DIR = os.path.join("benchmarks", "pages")
+
+RELATED_KINDS = ["related_word", "see_also", "compare"]
+
+HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8"/>
+<title>{word} | Cambridge English Dictionary</title>
+<link rel="stylesheet" href="/common.css"/>
+<script type="text/javascript">
+window.dataLayer = window.dataLayer || [];
+function gtag() {{ dataLayer.push(arguments); }}
+var template = '<div class="pr entry-body__el"><span class="pos dpos">fake</span></div>';
+{filler_script}
+</script>
+<style>.hdn {{ display: none; }} .def {{ font-weight: bold; }}</style>
+</head>
+<body class="break default_layout">
+<header class="pr bh hdf-xs lp-xs_l-15">
+<nav class="hdib hao lpt-2">
+<ul class="hul-u">
+{nav}
+</ul>
+</nav>
+<form class="pr search-form" action="/search/direct/" method="get"><input type="text" name="q" value="{word}"/><input type="hidden" name="datasetsearch" value="english"/></form>
+</header>
+<div class="page">
+"""
+
+FOOT = """</div>
+<footer class="pr bh hdf-xs">
+<ul class="hul-u">
+{nav}
+</ul>
+<p class="tc-w">&copy; Cambridge University Press &amp; Assessment</p>
+</footer>
+<script>{filler_script}</script>
+</body>
+</html>
+"""
+
+
+def get_nav(word: str) -> str:
+    links = []
+
+    for i in range(60):
+        links.append('<li class="hdib"><a href="/dictionary/english/%s-%d" title="%s %d">%s %d</a></li>' % (word, i, word, i, word, i))
+
+    return "\n".join(links)
+
+
+def get_filler_script(word: str) -> str:
+    lines = []
+
+    for i in range(40):
+        lines.append("var slot_%d = {'adunit': '/2863368/%s_%d', 'sizes': [[300, 250], [320, 100]], 'targeting': {'word': '%s'}};" % (i, word, i, word))
+
+    return "\n".join(lines)
+
+
+def get_xref(kind: str, title: str, words: list[str]) -> str:
+    items = "".join('<div class="item lc lc1 lpb-10 lpr-10"><a href="/dictionary/english/%s" title="%s"><span class="x-h dx-h">%s</span></a></div>' % (w, w, html.escape(w)) for w in words)
+    return '<div class="xref %s hax dxref-w lmt-25 lmb-25"><strong class="xref-title dxref-t">%s</strong><div class="lcs lp-10 lmb-10">%s</div></div>' % (kind, title, items)
+
+
+def get_meaning(meaning: str) -> str:
+    words = html.escape(meaning).split(" ")
+
+    # Link some words inside the definition like the live site does
+    for i in range(1, len(words), 4):
+        words[i] = '<a class="query" href="/dictionary/english/%s" title="%s">%s</a>' % (words[i], words[i], words[i])
+
+    return " ".join(words)
+
+
+def get_entry(word: str, row: list[str], index: int, prefix: str = "") -> str:
+    _, pos, pronunciation, meanings, examples, synonyms, antonyms, related, audio_source = row
+    gram = ""
+
+    if " [" in pos:
+        pos, gram = pos.split(" ", 1)
+        gram = ' <span class="gram dgram">%s</span>' % html.escape(gram).replace(" C ", ' <span class="gc dgc">C</span> ')
+
+    ipa = pronunciation.strip("/")
+    parts = []
+    parts.append('<div class="pr entry-body__el">')
+    parts.append('<div class="pos-header dpos-h">')
+    parts.append('<div class="di-title"><span class="headword hdb tw-bw dhw dpos-h_hw "><span class="hw dhw">%s</span></span></div>' % html.escape(word))
+    parts.append('<div class="posgram dpos-g hdib lmr-5"><span class="pos dpos" title="A word that describes a noun or pronoun.">%s</span>%s</div>' % (html.escape(pos), gram))
+
+    for region, source in [("uk", audio_source), ("us", audio_source.replace("uk_pron", "us_pron"))]:
+        parts.append('<span class="%s dpron-i "><span class="region dreg">%s</span><span class="daud"><audio class="hdn" preload="none" id="audio%d%s"><source type="audio/mpeg" src="%s"/><source type="audio/ogg" src="%s"/></audio><div title="Listen" class="i i-volume-up c_aud htc hdib hp hv-1 fon tcu tc-bd lmr-10 lpt-3" role="button" tabindex="0"></div></span><span class="pron dpron">/<span class="ipa dipa lpr-2 lpl-1">%s</span>/</span></span>' % (region, region, index, region, source, source.replace(".mp3", ".ogg"), html.escape(ipa)))
+
+    parts.append("</div>")
+    parts.append('<div class="pos-body">')
+
+    meanings = [m for m in meanings.split("|") if m]
+    examples = [e for e in examples.split("|") if e]
+
+    for i, meaning in enumerate(meanings):
+        parts.append('<div class="pr dsense "><div class="sense-body dsense_b">')
+        parts.append('<div class="def-block ddef_block " data-wl-senseid="ID_%s_%d">' % (word, i))
+        parts.append('<div class="ddef_h"><span class="def-info ddef-info"><span class="epp-xref dxref C2">C2</span> </span><div class="def ddef_d db">%s%s: </div></div>' % (prefix, get_meaning(meaning)))
+        parts.append('<div class="def-body ddef_b">')
+
+        if i < len(examples):
+            parts.append('<div class="examp dexamp"> <span class="eg deg">%s%s</span></div>' % (prefix, html.escape(examples[i])))
+            parts.append('<div class="examp dexamp"> <span class="eg deg">%s</span></div>' % "A second example that is not parsed.")
+
+        parts.append("</div></div>")
+        parts.append("</div></div>")
+
+    synonyms = [s for s in synonyms.split("|") if s]
+    antonyms = [a for a in antonyms.split("|") if a]
+    related = [r for r in related.split("|") if r]
+
+    if len(synonyms) == 1:
+        parts.append(get_xref("synonym", "Synonym", synonyms))
+    elif len(synonyms) > 1:
+        parts.append(get_xref("synonyms", "Synonyms", synonyms))
+
+    if antonyms:
+        parts.append(get_xref("opposite", "Opposite", antonyms))
+
+    if related:
+        kind = RELATED_KINDS[index % len(RELATED_KINDS)]
+        parts.append(get_xref(kind, "See also", related))
+
+    parts.append("</div>")
+    parts.append("</div>")
+
+    return "\n".join(parts)
+
+
+def get_page(word: str, rows: list[list[str]], index: int) -> str:
+    nav = get_nav(word)
+    filler_script = get_filler_script(word)
+    parts = [HEAD.format(word=html.escape(word), nav=nav, filler_script=filler_script)]
+    entries = "\n".join(get_entry(word, row, index * 10 + i) for i, row in enumerate(rows))
+
+    if index % 4 == 3:
+        parts.append('<div class="di-body"><div class="entry"><div class="entry-body">%s</div></div></div>' % entries)
+    else:
+        american = "\n".join(get_entry(word, row, index * 10 + 5 + i, "US ") for i, row in enumerate(rows))
+        parts.append('<div class="pr dictionary" data-id="cald4"><div class="di-body"><div class="entry"><div class="entry-body">%s</div></div></div></div>' % entries)
+        parts.append('<div class="pr dictionary" data-id="cacd"><div class="di-body"><div class="entry"><div class="entry-body">%s</div></div></div></div>' % american)
+
+    parts.append(FOOT.format(nav=nav, filler_script=filler_script))
+
+    return "".join(parts)
+
+
+def make_pages(deck_path: str = DECK_PATH, out_dir: str = OUT_DIR) -> list[str]:
+    words = {}
+
+    with open(deck_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            words.setdefault(row[0], []).append(row)
+
+    page_dir = os.path.join(out_dir, "dictionary", "english")
+    os.makedirs(page_dir, exist_ok=True)
+
+    for index, (word, rows) in enumerate(words.items()):
+        with open(os.path.join(page_dir, word + ".html"), "w", newline="", encoding="utf-8") as f:
+            f.write(get_page(word, rows, index))
+
+    return list(words)
+
+
+if __name__ == "__main__":
+    make_pages(*sys.argv[1:])
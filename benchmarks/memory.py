@@ -0,0 +1,87 @@
+"""
+Benchmark the memory used per word by a Dictionary of Vocabulary(s) with two Cluster(s) each.
+
+Compares the slotted, tuple-backed Cluster and Vocabulary against the previous plain classes,
+which kept a __dict__ and a list per field. Memory is measured with tracemalloc.
+
+Usage: python -m benchmarks.memory [size ...]
+"""
+
+import gc
+import sys
+import tracemalloc
+
+from benchmarks.dictionary import make_words
+from models.vocab.dictionary import Dictionary
+from models.vocab.vocabulary import Cluster, Vocabulary
+
+POS = ["noun", "verb", "adjective", "adverb"]
+
+
+class PlainCluster:
+    def __init__(self, pronunciation, meanings, examples, synonyms, antonyms, related, audio_source) -> None:
+        self.pronunciation = pronunciation
+        self.meanings = meanings
+        self.examples = examples
+        self.synonyms = synonyms
+        self.antonyms = antonyms
+        self.related = related
+        self.audio_source = audio_source
+
+
+class PlainVocabulary:
+    def __init__(self, word: str) -> None:
+        self.word = word
+        self.clusters = {}
+
+    def add_cluster(self, pos: str, cluster: PlainCluster) -> None:
+        self.clusters[pos] = cluster
+
+
+def make_fields(word: str, i: int) -> list:
+    # Strings are built per word, as they are when parsed from a CSV file or a page
+    return [
+        "/%s/" % word,
+        ("the meaning of %s|another meaning" % word).split("|"),
+        ("an example of %s." % word).split("|"),
+        ("big|large|" + POS[i % 2]).split("|"),
+        "".split("|"),
+        "".split("|"),
+        "/media/english/uk_pron/u/uk%s/uk%s/uk%s_001.mp3" % (word[:1], word[:3], word),
+    ]
+
+
+def measure(words: list[str], vocab_class, cluster_class) -> int:
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+
+    dictionary = Dictionary()
+
+    for i, word in enumerate(words):
+        vocab = vocab_class(word)
+
+        # Copies of the labels, as each parsed row has its own
+        vocab.add_cluster("".join(POS[i % 4]), cluster_class(*make_fields(word, i)))
+        vocab.add_cluster("".join(POS[(i + 1) % 4]), cluster_class(*make_fields(word, i + 1)))
+        dictionary.add_vocab(vocab)
+
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    return used
+
+
+def run(sizes: list[int]) -> None:
+    for size in sizes:
+        words = [sys.intern(word) for word in sorted(make_words(size))]
+
+        plain = measure(words, PlainVocabulary, PlainCluster)
+        compact = measure(words, Vocabulary, Cluster)
+
+        print("%d words: plain %.0f bytes/word, slotted %.0f bytes/word (%.0f%% less)" % (size, plain / size, compact / size, 100 - compact * 100 / plain))
+
+
+if __name__ == "__main__":
+    run([int(size) for size in sys.argv[1:]] or [100000])
@@ -0,0 +1,212 @@
+"""
+Benchmark NGram.fit on synthetic corpora of growing size.
+
+Sentences are drawn from a Zipf-distributed vocabulary, as in natural text, and the vocabulary set is built with
+build_vocab_set. Compares the integer-encoded fit against counting tuples of tokens in a dict, as done before,
+for time, peak memory while fitting and memory held by the counts, and checks that both give the same counts.
+Also times predict against scanning the whole vocabulary for the most frequent next token, as done before,
+and saving the model and loading it back through a memory map against fitting it again.
+Finally, streams the corpus from a file through build_vocab_set and fit with one process and with one per CPU,
+reporting the peak memory of a streamed fit, which holds one batch of lines at a time, and sweeps the add-k
+perplexity of a SmoothedNGram over held-out sentences for a grid of k, in one pass against one evaluation per k.
+
+Usage: python -m benchmarks.ngram [sentences ...]
+"""
+
+import bisect
+import itertools
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.dictionary import make_words
+from nlp.ngram import NGram, SmoothedNGram, load_ngram
+from nlp.preprocess import build_vocab_set
+
+TERMS = 50000
+KS = [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1, 3]
+
+
+def make_lines(count: int, rand: random.Random) -> list[str]:
+    terms = make_words(TERMS, seed=2)
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, TERMS + 1)))
+
+    return [" ".join(terms[bisect.bisect(weights, rand.random() * weights[-1])] for _ in range(rand.randint(5, 25))) for _ in range(count)]
+
+
+def fit_by_dict(model: NGram, train_lines: list[str]) -> dict[tuple, int]:
+    counter = {}
+
+    for line in train_lines:
+        tokens = model.tokenize(line)
+
+        for i in range(len(tokens) - model.n + 1):
+            token_set = tuple(tokens[i : i + model.n])
+            subset = tuple(token_set[:-1])
+
+            if token_set in counter:
+                counter[token_set] += 1
+            else:
+                counter[token_set] = 1
+
+            if subset in counter:
+                counter[subset] += 1
+            else:
+                counter[subset] = 1
+
+    return counter
+
+
+def predict_by_vocab(model: NGram, context: tuple) -> str:
+    max_prob = 0
+    next_token = "<UNK>"
+
+    for token in model.vocab_set:
+        token_set = context + (token, )
+
+        if token_set in model.counter:
+            prob = model.counter[token_set] / model.counter[context]
+
+            if prob > max_prob:
+                max_prob = prob
+                next_token = token
+
+    return next_token
+
+
+def perplexity_by_dict(model: SmoothedNGram, test_lines: list[str], k: float) -> float:
+    log_sum = 0
+    N = 0
+
+    for line in test_lines:
+        tokens = model.tokenize(line)
+        N += len(tokens)
+
+        for i in range(len(tokens) - model.n + 1):
+            token_set = tuple(tokens[i : i + model.n])
+            subset = tuple(token_set[:-1])
+            count = model.counter.get(token_set, 0)
+            log_sum += math.log2((count + k) / (model.counter.get(subset, 0) + k * model.V))
+
+    return pow(2, (-1 / N) * log_sum)
+
+
+def measure(func, *args) -> tuple[float, int, int]:
+    """
+    Return the time taken by func, and its peak and retained memory in bytes, measured in a second run.
+    """
+
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    result = func(*args)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return elapsed, peak, retained
+
+
+def run(sizes: list[int], n: int = 3) -> None:
+    rand = random.Random(0)
+
+    for size in sizes:
+        lines = make_lines(size, rand)
+        vocab_set = build_vocab_set(lines)
+        model = NGram(n, vocab_set)
+
+        def fit(lines: str | list[str]) -> NGram:
+            model = NGram(n, vocab_set)
+            model.fit(lines)
+
+            return model
+
+        dict_time, dict_peak, dict_retained = measure(fit_by_dict, model, lines)
+        fit_time, fit_peak, fit_retained = measure(fit, lines)
+
+        model.fit(lines)
+        same = model.counter == fit_by_dict(model, lines)
+
+        print("%d sentences, %d tokens, vocabulary of %d, %d-grams, same counts: %s" % (size, sum(len(line.split()) for line in lines), len(vocab_set), n, same))
+        print("  dict %.2f s, peak %.1f MB, counts %.1f MB" % (dict_time, dict_peak / 1e6, dict_retained / 1e6))
+        print("  integer keys %.2f s, peak %.1f MB, counts %.1f MB" % (fit_time, fit_peak / 1e6, fit_retained / 1e6))
+
+        contexts = []
+
+        for line in rand.sample(lines, 100):
+            tokens = model.tokenize(line)
+            start = rand.randrange(len(tokens) - n + 2)
+            contexts.append(tuple(tokens[start : start + n - 1]))
+
+        start = time.perf_counter()
+        [predict_by_vocab(model, context) for context in contexts]
+        vocab_time = (time.perf_counter() - start) / len(contexts) * 1000
+
+        start = time.perf_counter()
+        [model.predict(context) for context in contexts]
+        predict_time = (time.perf_counter() - start) / len(contexts) * 1000
+
+        start = time.perf_counter()
+        [model.predict_topk(context, 10) for context in contexts]
+        topk_time = (time.perf_counter() - start) / len(contexts) * 1000
+
+        print("  predict %.4f ms, top 10 %.4f ms, vocabulary scan %.3f ms" % (predict_time, topk_time, vocab_time))
+
+        path = os.path.join(tempfile.mkdtemp(), "model.ngram")
+        start = time.perf_counter()
+        model.save(path)
+        save_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded = load_ngram(path)
+        load_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        [loaded.predict(context) for context in contexts]
+        loaded_time = (time.perf_counter() - start) / len(contexts) * 1000
+
+        print("  saved in %.3f s to %.1f MB, loaded in %.2f ms, predict after loading %.4f ms" % (save_time, os.path.getsize(path) / 1e6, load_time * 1000, loaded_time))
+
+        corpus_path = os.path.join(tempfile.mkdtemp(), "corpus.txt")
+
+        with open(corpus_path, "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in lines)
+
+        for processes in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            streamed = NGram(n, build_vocab_set(corpus_path, processes=processes))
+            streamed.fit(corpus_path, processes=processes)
+            stream_time = time.perf_counter() - start
+
+            print("  streamed from file with %d processes, vocabulary and fit %.2f s, same counts: %s" % (processes, stream_time, np.array_equal(streamed.counts, model.counts)))
+
+        _, stream_peak, _ = measure(fit, corpus_path)
+        print("  streamed fit peak %.1f MB for a %.1f MB corpus" % (stream_peak / 1e6, os.path.getsize(corpus_path) / 1e6))
+
+        held_out = len(lines) // 10
+        smoothed = SmoothedNGram(n, vocab_set)
+        smoothed.fit(lines[held_out:])
+        smoothed.counter
+
+        start = time.perf_counter()
+        expected = [perplexity_by_dict(smoothed, lines[:held_out], k) for k in KS]
+        dict_sweep_time = time.perf_counter() - start
+
+        for processes in sorted({1, os.cpu_count() or 1}):
+            start = time.perf_counter()
+            perplexities = smoothed.get_perplexities(lines[:held_out], KS, processes)
+            sweep_time = time.perf_counter() - start
+
+            print("  add-k sweep over %d values of k with %d processes %.3f s, one evaluation per k %.2f s, same perplexities: %s" % (len(KS), processes, sweep_time, dict_sweep_time, np.allclose(perplexities, expected)))
+
+
+if __name__ == "__main__":
+    run([int(size) for size in sys.argv[1:]] or [10000, 100000])
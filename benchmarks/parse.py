@@ -0,0 +1,62 @@
+"""
+Benchmark the Cambridge page parser backends over the recorded page corpus.
+
+Reports parse time per page for each backend in api.cambridge.PARSERS and checks that they agree.
+
+Usage: python -m benchmarks.parse [repeat]
+"""
+
+import os
+import sys
+import time
+
+from api.cambridge import PARSERS
+from benchmarks.make_pages import OUT_DIR
+from models.vocab.dictionary import vocab_to_rows
+
+PAGE_DIR = os.path.join(OUT_DIR, "dictionary", "english")
+
+
+def load_pages(page_dir: str = PAGE_DIR) -> dict:
+    pages = {}
+
+    for file_name in sorted(os.listdir(page_dir)):
+        with open(os.path.join(page_dir, file_name), "r", encoding="utf-8") as f:
+            pages[os.path.splitext(file_name)[0]] = f.read()
+
+    return pages
+
+
+def run(repeat: int = 5) -> None:
+    pages = load_pages()
+    totals = {name: 0 for name in PARSERS}
+
+    print("%-16s %8s" % ("word", "KiB") + "".join("%12s" % (name + " ms") for name in PARSERS))
+
+    for word, html in pages.items():
+        times = []
+        outputs = []
+
+        for name, parse in PARSERS.items():
+            best = float("inf")
+
+            for _ in range(repeat):
+                start = time.perf_counter()
+                vocab = parse(html, word)
+                best = min(best, time.perf_counter() - start)
+
+            times.append(best)
+            totals[name] += best
+            outputs.append((vocab.word, vocab_to_rows(vocab)))
+
+        if any(output != outputs[0] for output in outputs):
+            raise AssertionError("Parsers disagree on %s" % word)
+
+        print("%-16s %8.1f" % (word, len(html) / 1024) + "".join("%12.3f" % (t * 1000) for t in times))
+
+    print()
+    print("%-25s" % "mean per page" + "".join("%12.3f" % (totals[name] / len(pages) * 1000) for name in PARSERS))
+
+
+if __name__ == "__main__":
+    run(*map(int, sys.argv[1:]))
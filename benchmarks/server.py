@@ -0,0 +1,166 @@
+"""
+A local stand-in for Cambridge Dictionary serving the recorded page corpus and audio clips.
+
+Pages are served from benchmarks/pages at the same paths as the live site. Audio clips are served from
+benchmarks/audio if recorded there, otherwise a deterministic placeholder clip of audio_size bytes is
+generated for any /media/ path. Latency, errors and throttling can be injected to load-test lookups.
+
+Usage: python -m benchmarks.server [--port 8000] [--latency 0.1] [--jitter 0.05] [--error-rate 0.01] [--rate-limit 20]
+Then point the app at it with the base_url setting or WORDSEA_BASE_URL=http://127.0.0.1:8000/
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlparse
+
+from benchmarks.make_pages import OUT_DIR
+
+AUDIO_DIR = os.path.join("benchmarks", "audio")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        server = self.server
+        server.count_request()
+
+        if server.latency > 0 or server.jitter > 0:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        if not server.acquire():
+            self.send_body(429, b"Too Many Requests", "text/plain", {"Retry-After": "1"})
+            return
+
+        if random.random() < server.error_rate:
+            self.send_body(503, b"Service Unavailable", "text/plain")
+            return
+
+        path = unquote(urlparse(self.path).path)
+
+        if path.startswith("/dictionary/"):
+            self.send_file(os.path.join(server.page_dir, path.strip("/") + ".html"), "text/html; charset=utf-8")
+        elif path.startswith("/media/"):
+            file_path = os.path.join(server.audio_dir, path.strip("/"))
+
+            if os.path.exists(file_path):
+                self.send_file(file_path, "audio/mpeg")
+            else:
+                self.send_body(200, server.get_placeholder_audio(path), "audio/mpeg")
+        else:
+            self.send_body(404, b"Not Found", "text/plain")
+
+    def send_file(self, path: str, content_type: str) -> None:
+        if not os.path.isfile(path):
+            self.send_body(404, b"Not Found", "text/plain")
+            return
+
+        with open(path, "rb") as f:
+            self.send_body(200, f.read(), content_type)
+
+    def send_body(self, status: int, body: bytes, content_type: str, headers: dict = {}) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+
+        for key, value in headers.items():
+            self.send_header(key, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server standing in for Cambridge Dictionary.
+    rate_limit throttles to that many requests per second with 429 responses; error_rate is the fraction of 503 responses.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, latency: float = 0, jitter: float = 0, error_rate: float = 0, rate_limit: float | None = None, audio_size: int = 16 * 1024, page_dir: str = OUT_DIR, audio_dir: str = AUDIO_DIR, verbose: bool = False) -> None:
+        super().__init__(("127.0.0.1", port), StandInHandler)
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.audio_size = audio_size
+        self.page_dir = page_dir
+        self.audio_dir = audio_dir
+        self.verbose = verbose
+
+        self.requests = 0
+        self.tokens = rate_limit or 0
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return "http://127.0.0.1:%d/" % self.server_address[1]
+
+    def count_request(self) -> None:
+        with self.lock:
+            self.requests += 1
+
+    def acquire(self) -> bool:
+        if not self.rate_limit:
+            return True
+
+        # Token bucket holding up to one second worth of requests
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate_limit, self.tokens + (now - self.last_refill) * self.rate_limit)
+            self.last_refill = now
+
+            if self.tokens < 1:
+                return False
+
+            self.tokens -= 1
+            return True
+
+    def get_placeholder_audio(self, path: str) -> bytes:
+        seed = hashlib.sha1(path.encode("utf-8")).digest()
+        return (seed * (self.audio_size // len(seed) + 1))[:self.audio_size]
+
+    def start(self) -> "StandInServer":
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded Cambridge Dictionary pages and audio locally.")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0, help="maximum random seconds added on top of latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="fraction of requests answered with 503")
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests per second before answering 429")
+    parser.add_argument("--audio-size", type=int, default=16 * 1024, help="bytes of generated audio clips")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = StandInServer(args.port, args.latency, args.jitter, args.error_rate, args.rate_limit, args.audio_size, verbose=args.verbose)
+    print("Serving on %s" % server.base_url)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -1,4 +1,10 @@
-from models.vocab.dictionary import Dictionary
+import os
+
+from api.audio import AudioCache
+from api.cache import LookupCache
+from api.cambridge import set_base_url
+from models.vocab.database import SQLiteDictionary, EXTENSIONS, load_dictionary
+from models.vocab.journal import JournalDictionary
 from models.config.settings import Settings
 from windows.dictionary import DictionaryWindow
 from windows.list import ListWindow
@@ -16,17 +22,81 @@ class WindowController:
     A controller for handling events across different windows.
     """
 
-    def __init__(self, dict_path: str, settings_path: str) -> None:
+    def __init__(self, dict_path: str, settings_path: str, cache_path: str, audio_dir: str) -> None:
         self.dict_path = dict_path
         self.settings_path = settings_path
+        self.cache_path = cache_path
+        self.audio_dir = audio_dir
         self.windows = {}
 
-        self.dict = Dictionary()
-        self.dict.from_csv(dict_path)
-
         self.settings = Settings()
         self.settings.from_csv(settings_path)
 
+        self.dict = load_dictionary(dict_path, self.is_lazy())
+
+        if self.settings.get_setting("base_url") != "":
+            set_base_url(self.settings.get_setting("base_url"))
+
+        self.cache = LookupCache(cache_path)
+        self.audio = AudioCache(audio_dir)
+
+    def is_lazy(self) -> bool:
+        # With lazy_load set, a CSV dictionary is only indexed at startup and words are parsed on first lookup
+        return self.settings.get_setting("lazy_load") in ("1", "true")
+
+    def is_weighted(self) -> bool:
+        # With weighted_sampling set, flashcards drill the whole deck, drawing harder words more often
+        return self.settings.get_setting("weighted_sampling") in ("1", "true")
+
+    def get_review_path(self) -> str:
+        # The review log of the flashcards is kept next to the dictionary it belongs to
+        return self.dict_path + ".reviewlog"
+
+    def open_dict(self, path: str) -> None:
+        self.dict.close()
+        self.dict = load_dictionary(path, self.is_lazy())
+        self.dict_path = path
+
+    def save_dict_as(self, path: str) -> None:
+        """
+        Save the dictionary to path. Saving to a database or a journaled CSV moves the dictionary into it, and saving a database to CSV exports a copy.
+        """
+
+        if os.path.abspath(path) == os.path.abspath(self.dict_path):
+            self.dict.save(path)
+            return
+
+        if path.lower().endswith(EXTENSIONS):
+            # Built aside and moved over path once complete, so that a failure leaves both files intact
+            temp_path = path + ".tmp"
+
+            for stale_path in (temp_path, temp_path + "-wal", temp_path + "-shm"):
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+
+            dictionary = SQLiteDictionary(temp_path)
+            dictionary.add_vocabs(self.dict.get_vocabs())
+            dictionary.close()
+
+            # Write-ahead files of a database at path belong to the replaced file
+            for stale_path in (path + "-wal", path + "-shm"):
+                if os.path.exists(stale_path):
+                    os.remove(stale_path)
+
+            os.replace(temp_path, path)
+
+            self.dict.close()
+            self.dict = SQLiteDictionary(path)
+            self.dict_path = path
+        elif isinstance(self.dict, JournalDictionary):
+            self.dict.move(path)
+            self.dict_path = path
+        else:
+            self.dict.to_csv(path)
+
+            if not isinstance(self.dict, SQLiteDictionary):
+                self.dict_path = path
+
     def call(self, window_id: str, func_name: str, *args, **kwargs) -> None:
         if window_id in self.windows:
             getattr(self.windows[window_id], func_name)(*args, **kwargs)
@@ -49,6 +119,9 @@ class WindowController:
 
         if len(self.windows) == 0:
             self.settings.to_csv(self.settings_path)
+            self.dict.close()
+            self.cache.close()
+            self.audio.close()
 
     def set_theme(self, qss_path: str) -> None:
         self.settings.set_setting("qss_path", qss_path)
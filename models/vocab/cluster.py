@@ -1,28 +1,74 @@
+import sys
+
+from typing import Iterable
+
+
+def pack(values: Iterable[str] | None, intern: bool = False) -> tuple[str, ...]:
+    """
+    Store a field as a tuple, interning short repeated strings such as related words.
+    A field left out and an empty field read from CSV, split into [""], are both stored as ().
+    """
+
+    if values == None:
+        return ()
+
+    if intern:
+        values = tuple(sys.intern(value) for value in values)
+    else:
+        values = tuple(values)
+
+    if values == ("", ):
+        return ()
+
+    return values
+
+
 class Cluster:
     """
     The basic unit of definitions and info of a word.
+    List fields are stored as tuples, and the directory of audio_source is interned as it is shared across words.
     """
 
-    def __init__(self, pronunciation: str = "", meanings: list[str] = [], examples: list[str] = [], synonyms: list[str] = [], antonyms: list[str] = [], related: list[str] = [], audio_source: str = "") -> None:
+    __slots__ = ("pronunciation", "meanings", "examples", "synonyms", "antonyms", "related", "audio_dir", "audio_file")
+
+    def __init__(self, pronunciation: str = "", meanings: Iterable[str] | None = None, examples: Iterable[str] | None = None, synonyms: Iterable[str] | None = None, antonyms: Iterable[str] | None = None, related: Iterable[str] | None = None, audio_source: str = "") -> None:
         self.pronunciation = pronunciation
-        self.meanings = meanings
-        self.examples = examples
-        self.synonyms = synonyms
-        self.antonyms = antonyms
-        self.related = related
+        self.meanings = pack(meanings)
+        self.examples = pack(examples)
+        self.synonyms = pack(synonyms, True)
+        self.antonyms = pack(antonyms, True)
+        self.related = pack(related, True)
         self.audio_source = audio_source
 
+    @property
+    def audio_source(self) -> str | None:
+        if self.audio_file == None:
+            return None
+
+        return self.audio_dir + self.audio_file
+
+    @audio_source.setter
+    def audio_source(self, audio_source: str | None) -> None:
+        if audio_source == None:
+            self.audio_dir = ""
+            self.audio_file = None
+            return
+
+        index = audio_source.rfind("/") + 1
+        self.audio_dir = sys.intern(audio_source[:index])
+        self.audio_file = audio_source[index:]
+
     def add_meaning(self, meaning: str) -> None:
-        self.meanings.append(meaning)
+        self.meanings += (meaning, )
 
     def add_example(self, example: str) -> None:
-        self.examples.append(example)
+        self.examples += (example, )
 
     def add_synonym(self, synonym: str) -> None:
-        self.synonyms.append(synonym)
+        self.synonyms += (sys.intern(synonym), )
 
     def add_antonym(self, antonym: str) -> None:
-        self.antonyms.append(antonym)
+        self.antonyms += (sys.intern(antonym), )
 
     def add_related(self, related: str) -> None:
-        self.related.append(related)
+        self.related += (sys.intern(related), )
@@ -0,0 +1,139 @@
+import sqlite3
+
+from models.vocab.dictionary import Dictionary, vocab_to_rows, vocab_from_rows
+from models.vocab.journal import JournalDictionary
+from models.vocab.lazy import LazyDictionary
+from models.vocab.vocabulary import Vocabulary
+
+EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+
+
+class SQLiteDictionary(Dictionary):
+    """
+    A Dictionary stored in an SQLite database, one row per Cluster.
+    Every change is written through as its own transaction, so saving costs nothing and only changed words are written.
+    Vocabulary(s) are read through the primary key index the first time they are looked up.
+    """
+
+    def __init__(self, path: str) -> None:
+        super().__init__()
+
+        self.path = path
+        self.word_set = set()
+        self.in_batch = False
+
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS clusters ("
+            "word TEXT NOT NULL, pos TEXT NOT NULL, seq INTEGER NOT NULL, pronunciation TEXT, meanings TEXT, examples TEXT, "
+            "synonyms TEXT, antonyms TEXT, related TEXT, audio_source TEXT, PRIMARY KEY (word, pos))"
+        )
+        self.conn.commit()
+
+        # Only the words are loaded up front, in index order
+        for (word, ) in self.conn.execute("SELECT DISTINCT word FROM clusters ORDER BY word"):
+            self.words.append(word)
+            self.word_set.add(word)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.word_set
+
+    def add_vocab(self, vocab: Vocabulary) -> None:
+        if vocab.word not in self:
+            self.insert_word(vocab.word)
+            self.word_set.add(vocab.word)
+
+        self.vocabs[vocab.word] = vocab
+        self.index_vocab(vocab)
+        self.write(vocab)
+
+    def remove_word(self, word: str) -> None:
+        if word not in self.word_set:
+            raise KeyError(word)
+
+        self.vocabs.pop(word, None)
+        self.word_set.remove(word)
+        self.delete_word(word)
+
+        self.conn.execute("DELETE FROM clusters WHERE word = ?", (word, ))
+        self.commit()
+
+    def get_vocab(self, word: str) -> Vocabulary | None:
+        vocab = self.vocabs.get(word, None)
+
+        if vocab is not None or word not in self.word_set:
+            return vocab
+
+        rows = self.conn.execute(
+            "SELECT word, pos, pronunciation, meanings, examples, synonyms, antonyms, related, audio_source "
+            "FROM clusters WHERE word = ? ORDER BY seq", (word, )
+        ).fetchall()
+
+        vocab = vocab_from_rows(rows)
+        self.vocabs[word] = vocab
+
+        return vocab
+
+    def write(self, vocab: Vocabulary) -> None:
+        rows = vocab_to_rows(vocab)
+
+        self.conn.execute("DELETE FROM clusters WHERE word = ?", (vocab.word, ))
+        self.conn.executemany(
+            "INSERT INTO clusters (word, pos, seq, pronunciation, meanings, examples, synonyms, antonyms, related, audio_source) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [row[:2] + [seq] + row[2:] for seq, row in enumerate(rows)]
+        )
+        self.commit()
+
+    def commit(self) -> None:
+        if not self.in_batch:
+            self.conn.commit()
+
+    def reset(self) -> None:
+        super().reset()
+        self.word_set.clear()
+
+        self.conn.execute("DELETE FROM clusters")
+        self.commit()
+
+    def save(self, path: str) -> None:
+        # Changes are already written through; save to another path exports a copy
+        if path != self.path:
+            self.to_csv(path)
+
+    def add_vocabs(self, vocabs: list[Vocabulary]) -> None:
+        # Write in a single transaction instead of one per Vocabulary
+        self.in_batch = True
+
+        try:
+            super().add_vocabs(vocabs)
+        finally:
+            self.in_batch = False
+            self.conn.commit()
+
+    def from_csv(self, path: str, delim: str = "|") -> None:
+        self.in_batch = True
+
+        try:
+            super().from_csv(path, delim)
+        finally:
+            self.in_batch = False
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def load_dictionary(path: str, lazy: bool = False) -> Dictionary:
+    """
+    Load a Dictionary from a database or a CSV file with its journal, by extension. A lazy CSV Dictionary parses words on first lookup.
+    """
+
+    if path.lower().endswith(EXTENSIONS):
+        return SQLiteDictionary(path)
+
+    if lazy:
+        return LazyDictionary(path)
+
+    return JournalDictionary(path)
@@ -1,9 +1,64 @@
 import os
 import csv
 
+from utils.fulltext import TextIndex
+from utils.fuzzy import FuzzyIndex
 from utils.search import bisect_left
+from models.vocab.graph import WordGraph
 from models.vocab.vocabulary import Cluster, Vocabulary
 
+FIELDS = ["word", "pos", "pronunciation", "meanings", "examples", "synonyms", "antonyms", "related", "audio_source"]
+
+
+def vocab_to_rows(vocab: Vocabulary, delim: str = "|") -> list[list[str]]:
+    """
+    Flatten a Vocabulary into rows of FIELDS, one row per Cluster.
+    """
+
+    rows = []
+
+    for pos, cluster in vocab.clusters.items():
+        pronunciation = cluster.pronunciation
+        meanings = delim.join(cluster.meanings)
+        examples = delim.join(cluster.examples)
+        synonyms = delim.join(cluster.synonyms)
+        antonyms = delim.join(cluster.antonyms)
+        related = delim.join(cluster.related)
+        audio_source = cluster.audio_source
+
+        rows.append([vocab.word, pos, pronunciation, meanings, examples, synonyms, antonyms, related, audio_source])
+
+    return rows
+
+
+def vocab_from_rows(rows: list[list[str]], delim: str = "|", vocab: Vocabulary = None) -> Vocabulary:
+    """
+    Build a Vocabulary from rows of FIELDS. Clusters are added to vocab if given.
+    """
+
+    for row in rows:
+        word, pos, pronunciation, meanings, examples, synonyms, antonyms, related, audio_source = row
+        meanings = meanings.split(delim)
+        examples = examples.split(delim)
+        synonyms = synonyms.split(delim)
+        antonyms = antonyms.split(delim)
+        related = related.split(delim)
+
+        if vocab == None:
+            vocab = Vocabulary(word)
+
+        vocab.add_cluster(pos, Cluster(pronunciation, meanings, examples, synonyms, antonyms, related, audio_source))
+
+    return vocab
+
+
+def vocab_to_text(vocab: Vocabulary) -> str:
+    """
+    Join the meanings and examples of a Vocabulary, as indexed for search_text.
+    """
+
+    return "\n".join("\n".join(cluster.meanings + cluster.examples) for cluster in vocab.clusters.values())
+
 
 class Dictionary:
     """
@@ -13,59 +68,159 @@ class Dictionary:
     def __init__(self) -> None:
         self.vocabs = {}
 
+        # Sorted index of words, kept in step with vocabs
+        self.words = []
+
+        # Indexes for suggest, search_text and get_word_graph, built on first use
+        self.fuzzy = None
+        self.text_index = None
+        self.graph = None
+
     def __len__(self) -> int:
-        return len(self.vocabs)
+        return len(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.vocabs
 
     def add_vocab(self, vocab: Vocabulary) -> None:
+        if vocab.word not in self:
+            self.insert_word(vocab.word)
+
         self.vocabs[vocab.word] = vocab
+        self.index_vocab(vocab)
+
+    def add_vocabs(self, vocabs: list[Vocabulary]) -> None:
+        for vocab in vocabs:
+            self.add_vocab(vocab)
 
     def remove_word(self, word: str) -> None:
         del self.vocabs[word]
+        self.delete_word(word)
+
+    def insert_word(self, word: str) -> None:
+        # Words loaded in order are appended without a search
+        if len(self.words) == 0 or self.words[-1] < word:
+            self.words.append(word)
+        else:
+            self.words.insert(bisect_left(self.words, word), word)
+
+        if self.fuzzy is not None:
+            self.fuzzy.add(word)
+
+    def delete_word(self, word: str) -> None:
+        del self.words[bisect_left(self.words, word)]
+
+        if self.fuzzy is not None:
+            self.fuzzy.remove(word)
+
+        if self.text_index is not None and word in self.text_index:
+            self.text_index.remove(word)
+
+        if self.graph is not None:
+            self.graph.remove_word(word)
+
+    def index_vocab(self, vocab: Vocabulary) -> None:
+        if self.text_index is not None:
+            self.text_index.add(vocab.word, vocab_to_text(vocab))
+
+        if self.graph is not None:
+            self.graph.add_vocab(vocab)
 
     def get_vocab(self, word: str) -> Vocabulary | None:
         return self.vocabs.get(word, None)
 
     def get_vocabs(self) -> list[Vocabulary]:
-        return [self.vocabs[word] for word in self.vocabs]
+        return [self.get_vocab(word) for word in self.words]
 
     def get_vocabs_by_prefix(self, prefix: str) -> list[Vocabulary]:
-        words = list(self.vocabs.keys())
+        return [self.get_vocab(word) for word in self.get_words_by_prefix(prefix)]
 
+    def get_words(self) -> list[str]:
+        return list(self.words)
+
+    def get_words_by_prefix(self, prefix: str) -> list[str]:
         if prefix == "":
-            return [self.vocabs[word] for word in words]
+            return list(self.words)
 
-        left = bisect_left(words, prefix)
-        right = bisect_left(words, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        left = bisect_left(self.words, prefix)
+        right = bisect_left(self.words, prefix[:-1] + chr(ord(prefix[-1]) + 1), left)
 
-        return [self.vocabs[word] for word in words[left:right]]
+        return self.words[left:right]
 
-    def get_words(self) -> list[str]:
-        return [word for word in self.vocabs]
+    def suggest(self, word: str, max_distance: int = 2, limit: int = 5) -> list[str]:
+        """
+        Return saved words within max_distance edits of word, closest first.
+        """
+
+        if self.fuzzy is None:
+            self.fuzzy = FuzzyIndex(self.words)
+
+        return self.fuzzy.search(word, max_distance, limit)
+
+    def search_text(self, query: str, limit: int = 10) -> list[str]:
+        """
+        Return saved words whose meanings and examples best match query, ranked by BM25.
+        """
+
+        if self.text_index is None:
+            self.text_index = TextIndex()
+
+            for word in self.words:
+                self.index_vocab(self.get_vocab(word))
+
+        return [word for word, _ in self.text_index.search(query, limit)]
+
+    def get_word_graph(self) -> WordGraph:
+        """
+        Return the graph of saved words linked by their synonyms, antonyms and related words.
+        """
+
+        if self.graph is None:
+            self.graph = WordGraph()
+
+            for word in self.words:
+                self.graph.add_vocab(self.get_vocab(word))
+
+        return self.graph
 
     def sort(self) -> None:
-        self.vocabs = dict(sorted(self.vocabs.items()))
+        """
+        Reorder vocabs by word. Only needed to iterate vocabs directly, as the word index is always sorted.
+        """
+
+        self.vocabs = {word: self.vocabs[word] for word in self.words}
 
     def reset(self) -> None:
         self.vocabs.clear()
+        self.words.clear()
+        self.fuzzy = None
+        self.text_index = None
+        self.graph = None
+
+    def save(self, path: str) -> None:
+        """
+        Persist the dictionary to its store at path.
+        """
+
+        self.to_csv(path)
 
     def to_csv(self, path: str, delim: str = "|") -> None:
-        with open(path, "w+", newline="", encoding="utf-8") as f:
-            fields = ["word", "pos", "pronunciation", "meanings", "examples", "synonyms", "antonyms", "related", "audio_source"]
-            writer = csv.writer(f, fields)
+        """
+        Write all words to path through a temporary file, so that a crash never leaves path half written.
+        """
+
+        temp_path = path + ".tmp"
+
+        with open(temp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, FIELDS)
 
-            for word in self.vocabs:
-                vocab = self.vocabs[word]
+            for word in self.words:
+                writer.writerows(vocab_to_rows(self.get_vocab(word), delim))
 
-                for pos, cluster in vocab.clusters.items():
-                    pronunciation = cluster.pronunciation
-                    meanings = delim.join(cluster.meanings)
-                    examples = delim.join(cluster.examples)
-                    synonyms = delim.join(cluster.synonyms)
-                    antonyms = delim.join(cluster.antonyms)
-                    related = delim.join(cluster.related)
-                    audio_source = cluster.audio_source
+            f.flush()
+            os.fsync(f.fileno())
 
-                    writer.writerow([word, pos, pronunciation, meanings, examples, synonyms, antonyms, related, audio_source])
+        os.replace(temp_path, path)
 
     def from_csv(self, path: str, delim: str = "|") -> None:
         if not os.path.exists(path):
@@ -75,17 +230,12 @@ class Dictionary:
             reader = csv.reader(f)
 
             for row in reader:
-                word, pos, pronunciation, meanings, examples, synonyms, antonyms, related, audio_source = row
-                meanings = meanings.split(delim)
-                examples = examples.split(delim)
-                synonyms = synonyms.split(delim)
-                antonyms = antonyms.split(delim)
-                related = related.split(delim)
-
-                vocab = self.get_vocab(word)
+                vocab = vocab_from_rows([row], delim, self.get_vocab(row[0]))
+                self.add_vocab(vocab)
 
-                if vocab == None:
-                    vocab = Vocabulary(word)
+    def close(self) -> None:
+        """
+        Release the store of the dictionary, if any.
+        """
 
-                vocab.add_cluster(pos, Cluster(pronunciation, meanings, examples, synonyms, antonyms, related, audio_source))
-                self.add_vocab(vocab)
+        pass
@@ -1,44 +1,256 @@
+import heapq
 import random
+import time
 
 from models.vocab.dictionary import Vocabulary, Dictionary
+from models.vocab.history import ReviewLog
+from utils.sampling import FenwickTree
+
+DAY = 24 * 60 * 60
+
+# A forgotten card comes back after this many seconds, and cards due this soon are shown without waiting
+RELEARN_DELAY = 60
+LEARN_AHEAD = 20 * 60
+
+# Answer qualities of SM-2, from 0 (blackout) to 5 (perfect); below PASS the card is forgotten
+LEARN_QUALITY = 4
+UNLEARN_QUALITY = 1
+PASS = 3
+
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+
+# In weighted sampling, cards in learning are drawn this many times as often as learned cards of the same difficulty
+LEARNING_WEIGHT = 4
+
+
+class ReviewState:
+    """
+    The SM-2 review state of a word: ease factor, interval in days, number of successful reviews in a row and due time.
+    """
+
+    __slots__ = ("word", "ease", "interval", "repetitions", "due")
+
+    def __init__(self, word: str, ease: float = DEFAULT_EASE, interval: float = 0, repetitions: int = 0, due: float = 0) -> None:
+        self.word = word
+        self.ease = ease
+        self.interval = interval
+        self.repetitions = repetitions
+        self.due = due
+
+    def get_difficulty(self) -> float:
+        """
+        Return how hard the word is, from 1 for a new word, growing as failed answers lower its ease.
+        """
+
+        return (DEFAULT_EASE / self.ease) ** 2
+
+    def review(self, quality: int, now: float) -> None:
+        """
+        Reschedule after an answer of quality, following SM-2.
+        """
+
+        if quality < PASS:
+            self.repetitions = 0
+            self.interval = 0
+            self.due = now + RELEARN_DELAY
+        else:
+            self.repetitions += 1
+
+            if self.repetitions == 1:
+                self.interval = 1
+            elif self.repetitions == 2:
+                self.interval = 6
+            else:
+                self.interval = round(self.interval * self.ease)
+
+            self.due = now + self.interval * DAY
+
+        self.ease = max(MIN_EASE, self.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
 
 
 class FlashCard:
     """
-    A model class for revising saved Vocabulary(s).
+    A model class for revising saved Vocabulary(s) with SM-2 spaced repetition.
+    Cards are kept in a heap by due time, so the next card is found in O(log n).
+    Every answer is appended to the ReviewLog at path, from which review states are restored.
+    A session covers the cards due when it starts, which are in learning until answered right.
+    With weighted set, cards are instead drawn from the whole deck in proportion to their difficulty, all of them
+    being in learning, from a Fenwick tree so that drawing and reweighting a card take O(log n).
     """
 
-    def __init__(self, dict: Dictionary) -> None:
+    def __init__(self, dict: Dictionary, path: str | None = None, now: float | None = None, weighted: bool = False) -> None:
+        self.dict = dict
+        self.log = ReviewLog(path) if path is not None else None
+        self.weighted = weighted
+        self.states = {}
         self.learning = set()
         self.learned = set()
         self.is_completed = False
-        self.learning_ratio = 0.8
 
-        for vocab in dict.vocabs.values():
-            self.learning.add(vocab)
+        # (due, order, word); entries whose due no longer matches the state of word are skipped
+        self.queue = []
+        self.order = 0
 
-    def get_next_vocab(self) -> Vocabulary:
-        if len(self.learning) == 0:
-            return None
+        saved_states = self.load_states() if self.log is not None else {}
+        now = time.time() if now is None else now
 
-        if len(self.learned) == 0:
-            return random.choice(list(self.learning))
+        # States of words removed from the dictionary are dropped
+        for word in dict.get_words():
+            state = saved_states.get(word)
 
-        # Larger learning ratio means higher chance of learning
-        rand = random.random()
+            if state is None:
+                state = ReviewState(word)
 
-        if rand <= self.learning_ratio:
-            return random.choice(list(self.learning))
-        else:
-            return random.choice(list(self.learned))
+            self.states[word] = state
+
+            if weighted or state.due <= now + LEARN_AHEAD:
+                self.learning.add(word)
+
+            self.queue.append((state.due, self.order, word))
+            self.order += 1
+
+        heapq.heapify(self.queue)
+        self.is_completed = len(self.learning) == 0
+
+        # Words by index in the sampler, for weighted sampling
+        self.words = None
+        self.indexes = None
+        self.sampler = None
+
+        if weighted:
+            self.words = list(self.states)
+            self.indexes = {word: index for index, word in enumerate(self.words)}
+            self.sampler = FenwickTree([self.get_weight(word) for word in self.words])
+
+    def get_weight(self, word: str) -> float:
+        state = self.states.get(word)
+
+        if state is None:
+            return 0.0
+
+        weight = state.get_difficulty()
+
+        return weight * LEARNING_WEIGHT if word in self.learning else weight
+
+    def update_weight(self, word: str) -> None:
+        if self.sampler is not None and word in self.indexes:
+            self.sampler.set(self.indexes[word], self.get_weight(word))
+
+    def push(self, state: ReviewState) -> None:
+        heapq.heappush(self.queue, (state.due, self.order, state.word))
+        self.order += 1
 
-    def learn(self, vocab: Vocabulary) -> None:
-        self.learned.add(vocab)
-        self.learning.discard(vocab)
+    def get_next_vocab(self, now: float | None = None) -> Vocabulary | None:
+        """
+        Return the Vocabulary due first, or None if no card is due within LEARN_AHEAD.
+        """
+
+        if self.weighted:
+            return self.sample_vocab()
+
+        now = time.time() if now is None else now
+        queue = self.queue
+
+        while len(queue) > 0:
+            due, _, word = queue[0]
+            state = self.states.get(word)
+
+            if state is None or state.due != due:
+                heapq.heappop(queue)
+                continue
+
+            if due > now + LEARN_AHEAD:
+                return None
+
+            vocab = self.dict.get_vocab(word)
+
+            if vocab is None:
+                # Removed from the dictionary since the session started
+                heapq.heappop(queue)
+                self.forget(word)
+                continue
+
+            return vocab
+
+        return None
+
+    def sample_vocab(self, rand: random.Random = random) -> Vocabulary | None:
+        """
+        Draw a Vocabulary in proportion to the weight of its word, or None if the deck is empty.
+        """
+
+        while True:
+            index = self.sampler.sample(rand)
+
+            if index is None:
+                return None
+
+            vocab = self.dict.get_vocab(self.words[index])
+
+            if vocab is not None:
+                return vocab
+
+            self.forget(self.words[index])
+
+    def review(self, vocab: Vocabulary, quality: int, now: float | None = None) -> None:
+        now = time.time() if now is None else now
+        state = self.states.get(vocab.word)
+
+        if state is None:
+            state = self.states[vocab.word] = ReviewState(vocab.word)
+
+        state.review(quality, now)
+        self.push(state)
+
+        if self.log is not None:
+            self.log.append(state.word, quality, state.ease, state.interval, state.repetitions, state.due, now)
+
+    def learn(self, vocab: Vocabulary, now: float | None = None) -> None:
+        # Drawing a learned card again in weighted sampling does not push its schedule further
+        if not self.weighted or vocab.word not in self.learned:
+            self.review(vocab, LEARN_QUALITY, now)
+
+        self.learned.add(vocab.word)
+        self.learning.discard(vocab.word)
+        self.update_weight(vocab.word)
 
         if len(self.learning) == 0:
             self.is_completed = True
 
-    def unlearn(self, vocab: Vocabulary) -> None:
-        self.learning.add(vocab)
-        self.learned.discard(vocab)
+    def unlearn(self, vocab: Vocabulary, now: float | None = None) -> None:
+        self.review(vocab, UNLEARN_QUALITY, now)
+        self.learning.add(vocab.word)
+        self.learned.discard(vocab.word)
+        self.update_weight(vocab.word)
+
+    def forget(self, word: str) -> None:
+        self.states.pop(word, None)
+        self.learning.discard(word)
+        self.learned.discard(word)
+        self.update_weight(word)
+
+        if len(self.learning) == 0:
+            self.is_completed = True
+
+    def get_state(self, word: str) -> ReviewState | None:
+        return self.states.get(word, None)
+
+    def load_states(self) -> dict[str, ReviewState]:
+        """
+        Return the review states left by the latest answer for every word in the log.
+        """
+
+        latest = self.log.get_latest()
+        columns = [latest[field].tolist() for field in ("word", "ease", "interval", "repetitions", "due")]
+        words = self.log.words
+
+        return {words[id]: ReviewState(words[id], ease, interval, repetitions, due) for id, ease, interval, repetitions, due in zip(*columns)}
+
+    def save(self) -> None:
+        if self.log is not None:
+            self.log.sync()
+
+    def close(self) -> None:
+        if self.log is not None:
+            self.log.close()
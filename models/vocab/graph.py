@@ -0,0 +1,364 @@
+from collections import deque
+
+from models.vocab.vocabulary import Vocabulary
+
+# Kinds of links, in the order of their counts on an edge
+KINDS = ("synonyms", "antonyms", "related")
+
+
+class WordGraph:
+    """
+    An undirected graph of words linked by the synonyms, antonyms and related words of saved Vocabulary(s).
+    Words are numbered and adjacency is kept by number. An edge counts the Vocabulary(s) listing it for each kind,
+    so that removing one Vocabulary only drops the links no other one lists.
+    Linked words that are not saved are nodes too, so that saved words sharing an unsaved synonym are connected.
+    Components over all kinds of links are kept once computed: added links merge them, and a component losing links
+    is only split again when one of its words is queried.
+    """
+
+    def __init__(self) -> None:
+        self.ids = {}
+        self.words = []
+
+        # id -> {neighbor id: [count per kind]}
+        self.adjacency = []
+
+        # id -> ((neighbor id, kind index), ...) listed by the saved Vocabulary of id, None if it is not saved
+        self.sources = []
+
+        # ids of nodes without any link or Vocabulary, for reuse
+        self.free_ids = []
+
+        # id -> component label, label -> [id, ...], and the labels of components that may have split
+        self.labels = None
+        self.members = None
+        self.dirty = set()
+        self.next_label = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.ids
+
+    def get_id(self, word: str) -> int:
+        id = self.ids.get(word)
+
+        if id is not None:
+            return id
+
+        if len(self.free_ids) > 0:
+            id = self.free_ids.pop()
+            self.words[id] = word
+        else:
+            id = len(self.words)
+            self.words.append(word)
+            self.adjacency.append({})
+            self.sources.append(None)
+
+            if self.labels is not None:
+                self.labels.append(None)
+
+        self.ids[word] = id
+
+        if self.labels is not None:
+            self.set_component([id])
+
+        return id
+
+    def release_id(self, id: int) -> None:
+        if self.words[id] is not None and len(self.adjacency[id]) == 0 and self.sources[id] is None:
+            del self.ids[self.words[id]]
+            self.words[id] = None
+            self.free_ids.append(id)
+
+    def is_saved(self, word: str) -> bool:
+        id = self.ids.get(word)
+        return id is not None and self.sources[id] is not None
+
+    def add_vocab(self, vocab: Vocabulary) -> None:
+        """
+        Link the word of vocab to the words its Cluster(s) list, replacing the links it listed before.
+        """
+
+        if self.is_saved(vocab.word):
+            self.remove_word(vocab.word)
+
+        id = self.get_id(vocab.word)
+        sources = set()
+
+        for cluster in vocab.clusters.values():
+            for kind, words in enumerate((cluster.synonyms, cluster.antonyms, cluster.related)):
+                for word in words:
+                    word = word.strip()
+
+                    if word != "" and word != vocab.word:
+                        sources.add((self.get_id(word), kind))
+
+        for neighbor, kind in sources:
+            self.link(id, neighbor, kind, 1)
+
+            if self.labels is not None:
+                self.merge(self.labels[id], self.labels[neighbor])
+
+        self.sources[id] = tuple(sources)
+
+    def remove_word(self, word: str) -> None:
+        """
+        Drop the links listed by the saved Vocabulary of word.
+        """
+
+        id = self.ids.get(word)
+
+        if id is None or self.sources[id] is None:
+            return
+
+        sources = self.sources[id]
+        self.sources[id] = None
+
+        if self.labels is not None:
+            self.dirty.add(self.labels[id])
+
+        for neighbor, kind in sources:
+            self.link(id, neighbor, kind, -1)
+            self.release_id(neighbor)
+
+        self.release_id(id)
+
+    def link(self, id: int, neighbor: int, kind: int, delta: int) -> None:
+        for a, b in ((id, neighbor), (neighbor, id)):
+            counts = self.adjacency[a].get(b)
+
+            if counts is None:
+                counts = self.adjacency[a][b] = [0] * len(KINDS)
+
+            counts[kind] += delta
+
+            if not any(counts):
+                del self.adjacency[a][b]
+
+    def get_kind_indexes(self, kinds: tuple[str, ...]) -> list[int]:
+        return [KINDS.index(kind) for kind in kinds]
+
+    def iter_neighbors(self, id: int, kinds: list[int]):
+        for neighbor, counts in self.adjacency[id].items():
+            for kind in kinds:
+                if counts[kind] > 0:
+                    yield neighbor
+                    break
+
+    def bfs(self, word: str, kinds: tuple[str, ...], max_hops: int | None = None) -> dict[int, int]:
+        """
+        Return {id: parent id} of the words reached from word, in breadth-first order.
+        """
+
+        start = self.ids[word]
+        kinds = self.get_kind_indexes(kinds)
+        parents = {start: start}
+        queue = deque([(start, 0)])
+
+        while len(queue) > 0:
+            id, hops = queue.popleft()
+
+            if max_hops is not None and hops == max_hops:
+                continue
+
+            for neighbor in self.iter_neighbors(id, kinds):
+                if neighbor not in parents:
+                    parents[neighbor] = id
+                    queue.append((neighbor, hops + 1))
+
+        return parents
+
+    def filter(self, ids, saved_only: bool) -> list[str]:
+        return [self.words[id] for id in ids if not saved_only or self.sources[id] is not None]
+
+    def get_neighbors(self, word: str, hops: int = 1, kinds: tuple[str, ...] = KINDS, saved_only: bool = False) -> list[str]:
+        """
+        Return the words within hops links of word, nearest first.
+        """
+
+        if word not in self.ids:
+            return []
+
+        parents = self.bfs(word, kinds, hops)
+        del parents[self.ids[word]]
+
+        return self.filter(parents, saved_only)
+
+    def get_path(self, word: str, other: str, kinds: tuple[str, ...] = KINDS) -> list[str] | None:
+        """
+        Return the shortest chain of linked words from word to other, or None if they are not connected.
+        """
+
+        if word not in self.ids or other not in self.ids:
+            return None
+
+        start = self.ids[word]
+        goal = self.ids[other]
+        kinds = self.get_kind_indexes(kinds)
+
+        # Breadth-first from both ends, expanding the smaller frontier
+        parents = {start: None}
+        children = {goal: None}
+        frontier = [start]
+        back_frontier = [goal]
+        meet = start if start == goal else None
+
+        while meet is None and len(frontier) > 0 and len(back_frontier) > 0:
+            if len(frontier) > len(back_frontier):
+                parents, children = children, parents
+                frontier, back_frontier = back_frontier, frontier
+
+            next_frontier = []
+
+            for id in frontier:
+                for neighbor in self.iter_neighbors(id, kinds):
+                    if neighbor in parents:
+                        continue
+
+                    parents[neighbor] = id
+                    next_frontier.append(neighbor)
+
+                    if neighbor in children:
+                        meet = neighbor
+                        break
+
+                if meet is not None:
+                    break
+
+            frontier = next_frontier
+
+        if meet is None:
+            return None
+
+        # parents and children may have been swapped; walk both halves and orient the path from word
+        path = []
+        id = meet
+
+        while id is not None:
+            path.append(id)
+            id = parents[id]
+
+        path.reverse()
+        id = children[meet]
+
+        while id is not None:
+            path.append(id)
+            id = children[id]
+
+        if path[0] != start:
+            path.reverse()
+
+        return [self.words[id] for id in path]
+
+    def set_component(self, ids: list[int]) -> None:
+        label = self.next_label
+        self.next_label += 1
+        self.members[label] = ids
+
+        for id in ids:
+            self.labels[id] = label
+
+    def merge(self, label: int, other: int) -> None:
+        if label == other:
+            return
+
+        # Relabel the smaller component
+        if len(self.members[label]) < len(self.members[other]):
+            label, other = other, label
+
+        # Released and reused ids stay listed in other, but belong to their new component
+        ids = [id for id in self.members.pop(other) if self.labels[id] == other and self.words[id] is not None]
+        self.members[label].extend(ids)
+
+        for id in ids:
+            self.labels[id] = label
+
+        if other in self.dirty:
+            self.dirty.discard(other)
+            self.dirty.add(label)
+
+    def split(self, label: int) -> None:
+        """
+        Recompute the components of the words of a component that lost links.
+        """
+
+        ids = [id for id in self.members.pop(label) if self.labels[id] == label and self.words[id] is not None]
+        self.dirty.discard(label)
+
+        for id in ids:
+            self.labels[id] = None
+
+        for id in ids:
+            if self.labels[id] is None:
+                self.set_component(list(self.bfs(self.words[id], KINDS)))
+
+    def compute_components(self) -> None:
+        if self.labels is not None:
+            return
+
+        self.labels = [None] * len(self.words)
+        self.members = {}
+        self.dirty.clear()
+
+        for id, word in enumerate(self.words):
+            if word is not None and self.labels[id] is None:
+                self.set_component(list(self.bfs(word, KINDS)))
+
+    def get_component(self, word: str) -> list[int]:
+        self.compute_components()
+        label = self.labels[self.ids[word]]
+
+        if label in self.dirty:
+            self.split(label)
+            label = self.labels[self.ids[word]]
+
+        # Released and reused ids stay listed until the component is split
+        return [id for id in self.members[label] if self.labels[id] == label and self.words[id] is not None]
+
+    def get_family(self, word: str, kinds: tuple[str, ...] = KINDS, saved_only: bool = False) -> list[str]:
+        """
+        Return the connected component of word, including word.
+        """
+
+        if word not in self.ids:
+            return []
+
+        if kinds != KINDS:
+            return self.filter(self.bfs(word, kinds), saved_only)
+
+        return self.filter(self.get_component(word), saved_only)
+
+    def get_families(self, kinds: tuple[str, ...] = KINDS, saved_only: bool = True, min_size: int = 2) -> list[list[str]]:
+        """
+        Return every connected component of at least min_size words, largest first.
+        """
+
+        families = []
+
+        if kinds == KINDS:
+            self.compute_components()
+
+            for label in list(self.dirty):
+                self.split(label)
+
+            components = self.members.values()
+        else:
+            seen = set()
+            components = []
+
+            for id, word in enumerate(self.words):
+                if word is not None and id not in seen:
+                    components.append(self.bfs(word, kinds))
+                    seen.update(components[-1])
+
+        for component in components:
+            family = self.filter(component, saved_only)
+
+            if len(family) >= min_size:
+                families.append(family)
+
+        families.sort(key=len, reverse=True)
+
+        return families
@@ -0,0 +1,162 @@
+import datetime
+import os
+import time
+
+import numpy as np
+
+# The start of a review log, and the layout of its fixed-size records
+MAGIC = b"REVLOG1\n"
+RECORD = np.dtype([
+    ("time", "<f8"),
+    ("word", "<u4"),
+    ("quality", "u1"),
+    ("ease", "<f8"),
+    ("interval", "<u4"),
+    ("repetitions", "<u2"),
+    ("due", "<f8"),
+])
+
+
+class ReviewLog:
+    """
+    An append-only log of flashcard answers at path, one fixed-size binary record per answer, holding its time,
+    the id of the word, the quality of the answer and the review state of the word after it.
+    Words are numbered in the order they are first reviewed and listed one per line at path + ".words".
+    Records are read back as a structured array, whose fields are the columns of the log, so that restoring
+    the latest state of every word and aggregating the history are done with vectorized NumPy operations.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.words_path = path + ".words"
+        self.words = []
+        self.ids = {}
+
+        if os.path.exists(self.words_path):
+            with open(self.words_path, "rb") as f:
+                data = f.read()
+
+            # Drop a word torn by a crash; its records were never written
+            size = data.rfind(b"\n") + 1
+            self.words = data[:size].decode("utf-8").splitlines()
+            self.ids = {word: id for id, word in enumerate(self.words)}
+
+            if size != len(data):
+                os.truncate(self.words_path, size)
+
+        if not os.path.exists(path) or os.path.getsize(path) < len(MAGIC):
+            with open(path, "wb") as f:
+                f.write(MAGIC)
+        else:
+            with open(path, "rb") as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError("Not a review log: %s" % path)
+
+            # Drop a record torn by a crash
+            size = os.path.getsize(path)
+            complete = size - (size - len(MAGIC)) % RECORD.itemsize
+
+            if complete != size:
+                os.truncate(path, complete)
+
+        self.count = (os.path.getsize(path) - len(MAGIC)) // RECORD.itemsize
+        self.file = open(path, "ab")
+        self.words_file = open(self.words_path, "ab")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def get_id(self, word: str) -> int:
+        id = self.ids.get(word)
+
+        if id is None:
+            id = self.ids[word] = len(self.words)
+            self.words.append(word)
+
+            # The word is listed before any record refers to it
+            self.words_file.write(word.encode("utf-8") + b"\n")
+            self.words_file.flush()
+
+        return id
+
+    def append(self, word: str, quality: int, ease: float, interval: int, repetitions: int, due: float, now: float | None = None) -> None:
+        """
+        Record an answer of quality for word, and the review state it left the word in.
+        """
+
+        record = np.array([(time.time() if now is None else now, self.get_id(word), quality, ease, interval, repetitions, due)], dtype=RECORD)
+        self.file.write(record.tobytes())
+        self.file.flush()
+        self.count += 1
+
+    def get_records(self) -> np.ndarray:
+        """
+        Return all records as a structured array of RECORD, oldest first.
+        """
+
+        with open(self.path, "rb") as f:
+            f.seek(len(MAGIC))
+            records = np.fromfile(f, dtype=RECORD, count=self.count)
+
+        # Records of words lost with a torn word list are ignored
+        if len(records) > 0 and records["word"].max() >= len(self.words):
+            records = records[records["word"] < len(self.words)]
+
+        return records
+
+    def get_latest(self, records: np.ndarray | None = None) -> np.ndarray:
+        """
+        Return the latest record of every reviewed word, ordered by word id.
+        """
+
+        if records is None:
+            records = self.get_records()
+
+        last = np.full(len(self.words), -1, dtype=np.int64)
+        np.maximum.at(last, records["word"], np.arange(len(records)))
+
+        return records[last[last >= 0]]
+
+    def get_retention(self, pass_quality: int = 3) -> dict[str, float]:
+        """
+        Return the share of answers of at least pass_quality for every reviewed word.
+        """
+
+        records = self.get_records()
+        totals = np.bincount(records["word"], minlength=len(self.words))
+        passes = np.bincount(records["word"], weights=records["quality"] >= pass_quality, minlength=len(self.words))
+        reviewed = np.flatnonzero(totals)
+
+        return dict(zip([self.words[id] for id in reviewed], (passes[reviewed] / totals[reviewed]).tolist()))
+
+    def get_reviews_per_day(self) -> dict[datetime.date, int]:
+        """
+        Return the number of answers given on every day with any, in local time.
+        """
+
+        records = self.get_records()
+
+        if len(records) == 0:
+            return {}
+
+        # Shift to local time by the current UTC offset, so that days are counted without converting every record
+        offset = datetime.datetime.now().astimezone().utcoffset().total_seconds()
+        days, counts = np.unique((records["time"] + offset) // 86400, return_counts=True)
+        epoch = datetime.date(1970, 1, 1).toordinal()
+
+        return {datetime.date.fromordinal(epoch + int(day)): count for day, count in zip(days.tolist(), counts.tolist())}
+
+    def sync(self) -> None:
+        """
+        Flush the log to disk.
+        """
+
+        for f in (self.words_file, self.file):
+            f.flush()
+            os.fsync(f.fileno())
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.sync()
+            self.words_file.close()
+            self.file.close()
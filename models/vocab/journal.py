@@ -0,0 +1,236 @@
+import json
+import os
+import threading
+
+from models.vocab.dictionary import Dictionary, vocab_to_rows, vocab_from_rows
+from models.vocab.vocabulary import Vocabulary
+
+# Compact once the journal outgrows the snapshot, but not for journals smaller than this
+MIN_COMPACT_BYTES = 1 << 20
+
+
+def replay(dict: Dictionary, path: str, delim: str = "|") -> int:
+    """
+    Apply the records of the journal at path to dict. Return the size of the complete records,
+    as a record torn by a crash has no line end and is ignored.
+    """
+
+    if not os.path.exists(path):
+        return 0
+
+    size = 0
+
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+
+            op = record[0]
+
+            if op == "set":
+                _, word, rows = record
+                dict.add_vocab(vocab_from_rows(rows, delim) if rows else Vocabulary(word))
+            elif op == "del":
+                if record[1] in dict:
+                    dict.remove_word(record[1])
+            elif op == "clear":
+                dict.reset()
+
+            size += len(line)
+
+    return size
+
+
+def merge_journals(path: str, delim: str = "|") -> None:
+    """
+    Replay the journals of the snapshot at path into it and remove them, so that path can be read as a plain CSV file.
+    """
+
+    journal_paths = [journal_path for journal_path in (path + ".journal.old", path + ".journal") if os.path.exists(journal_path)]
+
+    if len(journal_paths) == 0:
+        return
+
+    snapshot = Dictionary()
+    snapshot.from_csv(path, delim)
+
+    for journal_path in journal_paths:
+        replay(snapshot, journal_path, delim)
+
+    snapshot.to_csv(path, delim)
+
+    for journal_path in journal_paths:
+        os.remove(journal_path)
+
+
+class JournalDictionary(Dictionary):
+    """
+    A Dictionary stored as a CSV snapshot at path and an append-only journal of changes at path + ".journal".
+    Every change appends a record, so saving only syncs the journal. On load, the journal is replayed over the snapshot.
+    Once the journal outgrows the snapshot, it is rotated to path + ".journal.old" and merged into a new snapshot
+    in a background thread, which replaces the old one through a temporary file.
+    """
+
+    def __init__(self, path: str, delim: str = "|") -> None:
+        super().__init__()
+
+        self.path = path
+        self.delim = delim
+        self.journal_path = path + ".journal"
+        self.old_journal_path = path + ".journal.old"
+        self.in_batch = False
+        self.compactor = None
+
+        # Changes are only journaled after the snapshot and journals are loaded
+        self.journal = None
+
+        super().from_csv(path, delim)
+        replay(self, self.old_journal_path, delim)
+        size = replay(self, self.journal_path, delim)
+
+        # Drop a record torn by a crash, so that new records start on their own line
+        if os.path.exists(self.journal_path) and os.path.getsize(self.journal_path) != size:
+            os.truncate(self.journal_path, size)
+
+        self.journal = open(self.journal_path, "ab")
+
+        # A compaction interrupted by a crash is finished first
+        if os.path.exists(self.old_journal_path):
+            self.compact()
+
+    def write(self, record: list) -> None:
+        if self.journal is None:
+            return
+
+        self.journal.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+
+        if not self.in_batch:
+            self.journal.flush()
+
+    def add_vocab(self, vocab: Vocabulary) -> None:
+        super().add_vocab(vocab)
+        self.write(["set", vocab.word, vocab_to_rows(vocab, self.delim)])
+
+    def update_vocab(self, vocab: Vocabulary) -> None:
+        """
+        Journal a Vocabulary whose Cluster(s) were edited in place.
+        """
+
+        self.add_vocab(vocab)
+
+    def remove_word(self, word: str) -> None:
+        super().remove_word(word)
+        self.write(["del", word])
+
+    def reset(self) -> None:
+        super().reset()
+        self.write(["clear"])
+
+    def add_vocabs(self, vocabs: list[Vocabulary]) -> None:
+        self.in_batch = True
+
+        try:
+            super().add_vocabs(vocabs)
+        finally:
+            self.in_batch = False
+
+            if self.journal is not None:
+                self.journal.flush()
+
+    def from_csv(self, path: str, delim: str = "|") -> None:
+        self.in_batch = True
+
+        try:
+            super().from_csv(path, delim)
+        finally:
+            self.in_batch = False
+
+            if self.journal is not None:
+                self.journal.flush()
+
+    def save(self, path: str) -> None:
+        # Changes are already journaled; save to another path exports a copy
+        if path != self.path:
+            self.to_csv(path, self.delim)
+            return
+
+        self.sync()
+
+        if self.journal.tell() > max(MIN_COMPACT_BYTES, self.get_snapshot_size()):
+            self.compact()
+
+    def sync(self) -> None:
+        self.journal.flush()
+        os.fsync(self.journal.fileno())
+
+    def get_snapshot_size(self) -> int:
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def compact(self, wait: bool = False) -> None:
+        """
+        Merge the journal into a new snapshot in a background thread.
+        """
+
+        if self.compactor is not None and self.compactor.is_alive():
+            if wait:
+                self.compactor.join()
+
+            return
+
+        # Records after the rotation go to a new journal, and an unmerged old journal is merged first
+        if not os.path.exists(self.old_journal_path):
+            self.sync()
+            self.journal.close()
+            os.replace(self.journal_path, self.old_journal_path)
+            self.journal = open(self.journal_path, "ab")
+
+        self.compactor = threading.Thread(target=self.write_snapshot)
+        self.compactor.start()
+
+        if wait:
+            self.compactor.join()
+
+    def write_snapshot(self) -> None:
+        # Built from the files only, so the Dictionary can change while the snapshot is written
+        snapshot = Dictionary()
+        snapshot.from_csv(self.path, self.delim)
+        replay(snapshot, self.old_journal_path, self.delim)
+        snapshot.to_csv(self.path, self.delim)
+
+        os.remove(self.old_journal_path)
+
+    def move(self, path: str) -> None:
+        """
+        Write a new snapshot at path and journal later changes there. Journals left at path belong to the replaced file.
+        """
+
+        self.close()
+
+        for journal_path in (path + ".journal", path + ".journal.old"):
+            if os.path.exists(journal_path):
+                os.remove(journal_path)
+
+        self.to_csv(path, self.delim)
+
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.old_journal_path = path + ".journal.old"
+        self.journal = open(self.journal_path, "ab")
+
+    def close(self) -> None:
+        if self.compactor is not None:
+            self.compactor.join()
+
+        if self.journal is not None:
+            # A new dictionary gets its first snapshot, so that path can be opened as a CSV file
+            if not os.path.exists(self.path) and self.journal.tell() > 0:
+                self.compact(wait=True)
+
+            self.sync()
+            self.journal.close()
+            self.journal = None
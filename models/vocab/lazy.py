@@ -0,0 +1,184 @@
+import csv
+import io
+import mmap
+import os
+
+from models.vocab.dictionary import Dictionary, vocab_to_rows, vocab_from_rows
+from models.vocab.journal import merge_journals
+from models.vocab.vocabulary import Vocabulary
+
+
+class LazyDictionary(Dictionary):
+    """
+    A Dictionary backed by a memory-mapped CSV file.
+    Only a word -> byte offsets index is built at startup, and a Vocabulary is parsed the first time it is looked up.
+    Journals left by a JournalDictionary are merged into the file first, as changes are saved by rewriting it.
+    """
+
+    def __init__(self, path: str, delim: str = "|") -> None:
+        super().__init__()
+
+        self.path = path
+        self.delim = delim
+        self.file = None
+        self.mm = None
+
+        # word -> [(start, end), ...] byte spans of its rows in the file
+        self.offsets = {}
+
+        merge_journals(path, delim)
+
+        if os.path.exists(path):
+            self.map(path)
+            self.scan()
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.vocabs or word in self.offsets
+
+    def map(self, path: str) -> None:
+        self.file = open(path, "rb")
+
+        if os.path.getsize(path) > 0:
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def unmap(self) -> None:
+        if self.mm is not None:
+            self.mm.close()
+
+        if self.file is not None:
+            self.file.close()
+
+        self.mm = None
+        self.file = None
+
+    def scan(self) -> None:
+        """
+        Index the rows of the mapped file by word without parsing them.
+        """
+
+        mm = self.mm
+
+        if mm is None:
+            return
+
+        size = len(mm)
+        start = 0
+
+        while start < size:
+            end = mm.find(b"\n", start)
+            end = size if end == -1 else end + 1
+
+            # A quoted field may span lines; extend the row until its quotes are balanced
+            while mm.find(b'"', start, end) != -1 and mm[start:end].count(b'"') % 2 == 1 and end < size:
+                next_end = mm.find(b"\n", end)
+                end = size if next_end == -1 else next_end + 1
+
+            word = self.read_word(start, end)
+
+            if word is not None:
+                self.add_span(word, start, end)
+
+            start = end
+
+    def read_word(self, start: int, end: int) -> str | None:
+        if self.mm[start:start + 1] == b'"':
+            row = next(csv.reader(io.StringIO(self.mm[start:end].decode("utf-8"))), None)
+            return row[0] if row else None
+
+        comma = self.mm.find(b",", start, end)
+
+        if comma == -1:
+            return None
+
+        return self.mm[start:comma].decode("utf-8")
+
+    def add_span(self, word: str, start: int, end: int) -> None:
+        spans = self.offsets.get(word)
+
+        if spans is None:
+            self.offsets[word] = [(start, end)]
+            self.insert_word(word)
+        elif spans[-1][1] == start:
+            spans[-1] = (spans[-1][0], end)
+        else:
+            spans.append((start, end))
+
+    def read_rows(self, word: str) -> bytes:
+        return b"".join(self.mm[start:end] for start, end in self.offsets[word])
+
+    def add_vocab(self, vocab: Vocabulary) -> None:
+        if vocab.word not in self:
+            self.insert_word(vocab.word)
+
+        self.vocabs[vocab.word] = vocab
+        self.offsets.pop(vocab.word, None)
+        self.index_vocab(vocab)
+
+    def remove_word(self, word: str) -> None:
+        if word not in self:
+            raise KeyError(word)
+
+        self.vocabs.pop(word, None)
+        self.offsets.pop(word, None)
+        self.delete_word(word)
+
+    def get_vocab(self, word: str) -> Vocabulary | None:
+        vocab = self.vocabs.get(word, None)
+
+        if vocab is not None or word not in self.offsets:
+            return vocab
+
+        text = self.read_rows(word).decode("utf-8")
+        vocab = vocab_from_rows(csv.reader(io.StringIO(text, newline="")), self.delim)
+
+        # Hydrated Vocabulary(s) are kept, so they can be edited in place like in Dictionary
+        self.vocabs[word] = vocab
+        del self.offsets[word]
+
+        return vocab
+
+    def reset(self) -> None:
+        super().reset()
+        self.offsets.clear()
+
+    def to_csv(self, path: str, delim: str = "|") -> None:
+        """
+        Write all words to path through a temporary file. Rows of words never looked up are copied as bytes.
+        """
+
+        temp_path = path + ".tmp"
+        offsets = {}
+
+        with open(temp_path, "wb") as f:
+            for word in self.words:
+                start = f.tell()
+
+                if word in self.offsets:
+                    data = self.read_rows(word)
+
+                    if not data.endswith(b"\n"):
+                        data += b"\r\n"
+                else:
+                    buffer = io.StringIO(newline="")
+                    csv.writer(buffer).writerows(vocab_to_rows(self.vocabs[word], delim))
+                    data = buffer.getvalue().encode("utf-8")
+
+                f.write(data)
+
+                if word in self.offsets:
+                    offsets[word] = [(start, f.tell())]
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        # The mapped file cannot be replaced while mapped on every platform
+        if os.path.abspath(path) == os.path.abspath(self.path):
+            self.unmap()
+            os.replace(temp_path, path)
+            self.map(path)
+            self.offsets = offsets
+        else:
+            os.replace(temp_path, path)
+
+    def close(self) -> None:
+        self.unmap()
@@ -1,3 +1,5 @@
+import sys
+
 from models.vocab.cluster import Cluster
 
 
@@ -6,6 +8,8 @@ class Vocabulary:
     A word defined by Cluster(s).
     """
 
+    __slots__ = ("word", "clusters")
+
     def __init__(self, word: str = "") -> None:
         self.word = word
         self.clusters = {}
@@ -29,7 +33,8 @@ class Vocabulary:
         return self.word
 
     def add_cluster(self, pos: str, cluster: Cluster) -> None:
-        self.clusters[pos] = cluster
+        # Part-of-speech labels repeat across every word
+        self.clusters[sys.intern(pos)] = cluster
 
     def get_cluster(self, pos: str) -> Cluster | None:
         return self.clusters.get(pos, None)
@@ -1,95 +1,468 @@
+import itertools
+import json
 import math
+import mmap
+import os
+from typing import Iterable
+
+import numpy as np
+
+from nlp.preprocess import BATCH_SIZE, read_batches, map_batches
+
+START = "<START>"
+END = "<END>"
+UNK = "<UNK>"
+
+# The start of a saved model, the alignment of its arrays, and the arrays saved
+MAGIC = b"NGRAM01\n"
+ALIGN = 64
+ARRAYS = ("keys", "counts", "context_keys", "context_counts", "successors", "successor_counts", "successor_excluded", "context_starts")
+
+# Counts of batches merged together while fitting
+MERGE_BATCHES = 8
+
+
+def merge_counts(partials: list[tuple[np.ndarray, np.ndarray]]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merge sorted unique keys and their counts into one sorted array of unique keys, summing the counts of equal keys.
+    """
+
+    if len(partials) == 1:
+        return partials[0]
+
+    keys = np.concatenate([keys for keys, _ in partials])
+    counts = np.concatenate([counts for _, counts in partials])
+
+    if len(keys) == 0:
+        return keys, counts
+
+    # A stable sort merges the sorted runs in linear time
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    counts = counts[order]
+    boundaries = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+
+    return keys[boundaries], np.add.reduceat(counts, boundaries)
+
+
+def lookup(keys: np.ndarray, counts: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    """
+    Return the counts of queries in sorted keys and their counts, 0 for queries not in keys.
+    """
+
+    if len(keys) == 0:
+        return np.zeros(len(queries), dtype=np.int64)
+
+    index = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+
+    return np.where(keys[index] == queries, counts[index], 0)
+
+
+class TokenIds(dict):
+    """
+    A mapping of tokens to ids, giving the id of <UNK> to tokens out of the vocabulary.
+    """
+
+    def __init__(self, tokens: list[str]) -> None:
+        super().__init__(zip(tokens, range(len(tokens))))
+
+        self.unk_id = self[UNK]
+
+    def __missing__(self, token: str) -> int:
+        return self.unk_id
 
 
 class NGram:
     """
     N-gram language model.
+    Tokens are numbered, and each n-gram is counted as one integer key packing the ids of its tokens in base
+    len(tokens), with the first token as the most significant digit. Keys too large for int64 are Python ints.
+    The next tokens of each context are ranked at fit time, so that predicting takes one binary search.
     """
 
-    def __init__(self, n: int, vocab_set: set) -> None:
+    def __init__(self, n: int, vocab_set: set, tokens: list[str] | None = None) -> None:
         assert n >= 1
 
         self.n = n
         self.vocab_set = vocab_set
-        self.counter = None
+
+        # Tokens by id, with <UNK> first as out-of-vocabulary tokens, padding included, are counted as <UNK>.
+        # A saved model passes its tokens, already in this order
+        self.tokens = tokens if tokens is not None else [UNK] + sorted(vocab_set - {UNK})
+        self.token_ids = TokenIds(self.tokens)
+        self.key_dtype = np.int64 if len(self.tokens) ** n < 2 ** 63 else object
+
+        # Sorted keys of the n-grams and of their contexts, the first n - 1 tokens, with their counts
+        self.keys = None
+        self.counts = None
+        self.context_keys = None
+        self.context_counts = None
+        self.cached_counter = None
+
+        # Ids and counts of the next tokens of each context, most frequent first, from context_starts[i] for context i
+        self.successors = None
+        self.successor_counts = None
+        self.successor_excluded = None
+        self.context_starts = None
+
+        # The file the model was loaded from, which worker processes load again to share its pages
+        self.path = None
+
+    def __getstate__(self) -> dict:
+        # Sent to worker processes without the decoded counter
+        state = self.__dict__.copy()
+        state["cached_counter"] = None
+
+        return state
+
+    @property
+    def counter(self) -> dict[tuple, int] | None:
+        """
+        The counts of the n-grams and of their contexts by tuple of tokens, decoded on first use.
+        """
+
+        if self.keys is None:
+            return None
+
+        if self.cached_counter is None:
+            counter = dict(zip(self.decode(self.keys, self.n), self.counts.tolist()))
+            counter.update(zip(self.decode(self.context_keys, self.n - 1), self.context_counts.tolist()))
+            self.cached_counter = counter
+
+        return self.cached_counter
 
     def tokenize(self, sentence: str) -> list[str]:
-        start = ["<START>"] * (self.n - 1) if self.n > 1 else ["<START>"]
-        end = ["<END>"] * (self.n - 1) if self.n > 1 else ["<END>"]
-        tokens = start + sentence.strip().split() + end
+        start = [START] * (self.n - 1) if self.n > 1 else [START]
+        end = [END] * (self.n - 1) if self.n > 1 else [END]
+        vocab_set = self.vocab_set
 
-        for i in range(len(tokens)):
-            if tokens[i] not in self.vocab_set:
-                tokens[i] = "<UNK>"
+        return [token if token in vocab_set else UNK for token in start + sentence.strip().split() + end]
 
-        return tokens
+    def encode(self, lines: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the ids of the tokens of lines, padded as by tokenize, in one array, and the end of each line in it.
+        """
+
+        pad = max(self.n - 1, 1)
+        tokens = []
+        lengths = []
+
+        for line in lines:
+            line_tokens = line.split()
+            tokens.extend(line_tokens)
+            lengths.append(len(line_tokens))
+
+        ids = np.fromiter(map(self.token_ids.get, tokens, itertools.repeat(self.token_ids.unk_id)), dtype=np.int32, count=len(tokens))
+        lengths = np.array(lengths, dtype=np.int64)
+        ends = np.cumsum(lengths + 2 * pad)
+        starts = ends - lengths - 2 * pad
+
+        encoded = np.full(ends[-1] if len(ends) > 0 else 0, self.token_ids[END], dtype=np.int32)
+
+        for i in range(pad):
+            encoded[starts + i] = self.token_ids[START]
+
+        # Shift the tokens of each line past the padding of the lines before
+        encoded[np.arange(len(ids)) + np.repeat(starts + pad - (np.cumsum(lengths) - lengths), lengths)] = ids
+
+        return encoded, ends
+
+    def get_keys(self, encoded: np.ndarray, ends: np.ndarray) -> np.ndarray:
+        """
+        Return the keys of the n-grams of encoded lines, without those spanning two lines.
+        """
+
+        is_start = np.ones(len(encoded), dtype=bool)
+
+        for i in range(1, self.n):
+            is_start[ends - i] = False
+
+        starts = np.flatnonzero(is_start)
+        keys = np.zeros(len(starts), dtype=self.key_dtype)
+
+        for i in range(self.n):
+            keys = keys * len(self.tokens) + encoded[starts + i].astype(self.key_dtype)
+
+        return keys
+
+    def decode(self, keys: np.ndarray, length: int) -> list[tuple]:
+        """
+        Return the tuples of tokens packed in keys of length tokens.
+        """
+
+        if length == 0:
+            return [()] * len(keys)
+
+        tokens = np.array(self.tokens, dtype=object)
+        columns = []
+
+        for _ in range(length):
+            columns.append(tokens[(keys % len(self.tokens)).astype(np.int64)])
+            keys = keys // len(self.tokens)
+
+        return list(zip(*reversed(columns)))
+
+    def set_counts(self, keys: np.ndarray, counts: np.ndarray) -> None:
+        """
+        Set the counts of the n-grams from their sorted unique keys, and count their contexts.
+        """
+
+        self.keys = keys
+        self.counts = counts
+
+        # The counts no longer match the file the model was loaded from
+        self.path = None
+
+        # Keys sharing a context are adjacent, as the context is their leading digits
+        contexts = keys // len(self.tokens)
+        boundaries = np.flatnonzero(np.concatenate(([True], contexts[1:] != contexts[:-1]))) if len(keys) > 0 else np.zeros(0, dtype=np.int64)
+
+        self.context_keys = contexts[boundaries]
+        self.context_counts = np.add.reduceat(counts, boundaries) if len(keys) > 0 else np.zeros(0, dtype=np.int64)
+        self.cached_counter = None
+
+        # Rank the next tokens within each context by count, with <UNK> last if it is not in the vocabulary
+        # as predict only chooses tokens of the vocabulary. The sort is stable, so ties stay in order of id
+        successors = (keys % len(self.tokens)).astype(np.int32)
+        excluded = (successors == self.token_ids.unk_id) & (UNK not in self.vocab_set)
+        context_ids = np.repeat(np.arange(len(boundaries)), np.diff(np.append(boundaries, len(keys))))
+        order = np.lexsort((-counts, excluded, context_ids))
+
+        self.successors = successors[order]
+        self.successor_counts = counts[order]
+        self.successor_excluded = excluded[order]
+        self.context_starts = np.append(boundaries, len(keys))
+
+    def count(self, lines: list[str]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the sorted unique keys of the n-grams of lines and their counts.
+        """
+
+        keys, counts = np.unique(self.get_keys(*self.encode(lines)), return_counts=True)
+
+        return keys, counts.astype(np.int64)
+
+    def count_lines(self, source: str | Iterable[str], processes: int = 1, batch_size: int = BATCH_SIZE) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Count the n-grams of source, a path to a text file or an iterable of lines, read in batches of batch_size lines.
+        Batches are counted by processes processes, and their counts merged as they come.
+        """
+
+        batches = read_batches(source, batch_size)
+
+        if processes > 1:
+            results = map_batches(count_batch, batches, processes, init_worker, (type(self), self.n, self.vocab_set, self.tokens))
+        else:
+            results = map(self.count, batches)
 
-    def fit(self, train_lines: list[str]) -> None:
-        counter = {}
+        partials = []
 
-        for line in train_lines:
-            tokens = self.tokenize(line)
+        for partial in results:
+            partials.append(partial)
 
-            for i in range(len(tokens) - self.n + 1):
-                token_set = tuple(tokens[i : i + self.n])
-                subset = tuple(token_set[:-1])
+            if len(partials) == MERGE_BATCHES:
+                partials = [merge_counts(partials)]
 
-                if token_set in counter:
-                    counter[token_set] += 1
-                else:
-                    counter[token_set] = 1
+        if len(partials) == 0:
+            return np.zeros(0, dtype=self.key_dtype), np.zeros(0, dtype=np.int64)
 
-                if subset in counter:
-                    counter[subset] += 1
-                else:
-                    counter[subset] = 1
+        return merge_counts(partials)
 
-        self.counter = counter
+    def fit(self, train_lines: str | Iterable[str], processes: int = 1, batch_size: int = BATCH_SIZE) -> None:
+        """
+        Count the n-grams of train_lines, a path to a text file or an iterable of lines, streamed in batches.
+        """
+
+        self.set_counts(*self.count_lines(train_lines, processes, batch_size))
+
+    def update(self, lines: str | Iterable[str], processes: int = 1, batch_size: int = BATCH_SIZE) -> None:
+        """
+        Add the n-grams of lines to the counts of a fitted model. Tokens out of the vocabulary are counted as <UNK>.
+        """
+
+        assert self.keys is not None
+
+        self.set_counts(*merge_counts([(self.keys, self.counts), self.count_lines(lines, processes, batch_size)]))
+
+    def get_count(self, token_set: tuple) -> int:
+        """
+        Return the count of an n-gram, or of a context of n - 1 tokens, by binary search over the sorted keys.
+        """
+
+        if len(token_set) != self.n and len(token_set) != self.n - 1:
+            return 0
+
+        key = 0
+
+        for token in token_set:
+            id = self.token_ids.get(token)
+
+            if id is None:
+                return 0
+
+            key = key * len(self.tokens) + id
+
+        keys, counts = (self.keys, self.counts) if len(token_set) == self.n else (self.context_keys, self.context_counts)
+        index = int(np.searchsorted(keys, key))
+
+        if index == len(keys) or keys[index] != key:
+            return 0
+
+        return int(counts[index])
 
     def get_log_prob(self, token_set: tuple) -> float:
         subset = tuple(token_set[:-1])
-        return math.log2(self.counter[token_set] / self.counter[subset])
+        return math.log2(self.get_count(token_set) / self.get_count(subset))
+
+    def get_batch_histograms(self, lines: list[str]) -> tuple[tuple[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray], int]:
+        """
+        Return how many n-grams of lines have each count in the model, as sorted unique counts and their frequencies,
+        the same for the counts of their contexts, and the number of tokens of lines, padding included.
+        """
+
+        encoded, ends = self.encode(lines)
+        keys = self.get_keys(encoded, ends)
+        counts = lookup(self.keys, self.counts, keys)
+        context_counts = lookup(self.context_keys, self.context_counts, keys // len(self.tokens))
+
+        return np.unique(counts, return_counts=True), np.unique(context_counts, return_counts=True), len(encoded)
+
+    def get_histograms(self, test_lines: str | Iterable[str], processes: int = 1, batch_size: int = BATCH_SIZE) -> tuple[tuple[np.ndarray, np.ndarray], tuple[np.ndarray, np.ndarray], int]:
+        """
+        Return the histograms of get_batch_histograms for test_lines, a path to a text file or an iterable of lines,
+        read in batches of batch_size lines and evaluated by processes processes.
+        The log probability of an n-gram only depends on its count and the count of its context,
+        so these histograms are enough to compute perplexity.
+        """
+
+        assert self.keys is not None
 
-    def get_perplexity(self, test_lines: list[str]) -> float:
-        assert self.counter != None
+        batches = read_batches(test_lines, batch_size)
 
-        log_sum = 0
+        if processes > 1:
+            results = map_batches(evaluate_batch, batches, processes, init_evaluator, (self.path or self, ))
+        else:
+            results = map(self.get_batch_histograms, batches)
+
+        histograms = []
+        context_histograms = []
         N = 0
 
-        for line in test_lines:
-            tokens = self.tokenize(line)
-            N += len(tokens)
+        for histogram, context_histogram, tokens in results:
+            histograms.append(histogram)
+            context_histograms.append(context_histogram)
+            N += tokens
+
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+        return merge_counts(histograms + [empty]), merge_counts(context_histograms + [empty]), N
+
+    def get_perplexity(self, test_lines: str | Iterable[str], processes: int = 1, batch_size: int = BATCH_SIZE) -> float:
+        (counts, frequencies), (context_counts, context_frequencies), N = self.get_histograms(test_lines, processes, batch_size)
+
+        # An unseen n-gram has no probability
+        if len(counts) > 0 and counts[0] == 0:
+            return float("inf")
+
+        log_sum = (frequencies * np.log2(counts)).sum() - (context_frequencies * np.log2(context_counts)).sum()
+
+        return pow(2, (-1 / N) * float(log_sum))
+
+    def get_context_index(self, context: tuple) -> int | None:
+        """
+        Return the index of the last n - 1 tokens of context in context_keys, or None if they were never seen.
+        """
+
+        if len(context) < self.n - 1:
+            return None
+
+        key = 0
+
+        for token in context[len(context) - self.n + 1:]:
+            id = self.token_ids.get(token)
+
+            if id is None:
+                return None
+
+            key = key * len(self.tokens) + id
+
+        index = int(np.searchsorted(self.context_keys, key))
+
+        if index == len(self.context_keys) or self.context_keys[index] != key:
+            return None
+
+        return index
 
-            for i in range(len(tokens) - self.n + 1):
-                token_set = tuple(tokens[i : i + self.n])
+    def predict_topk(self, context: tuple, k: int = 5) -> list[tuple[str, float]]:
+        """
+        Return up to k tokens of the vocabulary most likely to follow context, with their probabilities, most likely first.
+        """
 
-                if token_set in self.counter:
-                    log_sum += self.get_log_prob(token_set)
-                else:
-                    return float("inf")
+        assert self.keys is not None
 
-        return pow(2, (-1 / N) * log_sum)
+        index = self.get_context_index(context)
+
+        if index is None:
+            return []
+
+        start = self.context_starts[index]
+        end = min(self.context_starts[index + 1], start + k)
+        end = start + int(np.count_nonzero(~self.successor_excluded[start:end]))
+        total = self.context_counts[index]
+
+        return [(self.tokens[id], float(count / total)) for id, count in zip(self.successors[start:end].tolist(), self.successor_counts[start:end].tolist())]
 
     def predict(self, context: tuple) -> str:
-        assert self.counter != None
+        """
+        Return the token most likely to follow the last n - 1 tokens of context, or <UNK> if none is known.
+        """
+
+        topk = self.predict_topk(context, 1)
+
+        return topk[0][0] if len(topk) > 0 else UNK
+
+    def save(self, path: str) -> None:
+        """
+        Write the model to path: MAGIC, the length of a JSON header, the header, then the arrays of ARRAYS at offsets
+        aligned to ALIGN bytes, as listed in the header. Written through a temporary file.
+        """
+
+        assert self.keys is not None
+
+        if self.key_dtype is object:
+            raise ValueError("Keys of %d-grams over %d tokens do not fit in int64 and cannot be saved" % (self.n, len(self.tokens)))
+
+        arrays = {}
+        offset = 0
 
-        max_prob = 0
-        next_token = "<UNK>"
+        for name in ARRAYS:
+            array = np.ascontiguousarray(getattr(self, name))
+            arrays[name] = (offset, array.dtype.str, len(array))
+            offset += -(-array.nbytes // ALIGN) * ALIGN
 
-        for token in self.vocab_set:
-            token_set = context + (token, )
+        header = {"class": type(self).__name__, "n": self.n, "tokens": self.tokens, "has_unk": UNK in self.vocab_set, "arrays": arrays}
+        header = json.dumps(header).encode("utf-8")
+        start = len(MAGIC) + 8 + len(header)
+        temp_path = path + ".tmp"
 
-            if token_set in self.counter:
-                prob = self.counter[token_set] / self.counter[context]
+        with open(temp_path, "wb") as f:
+            f.write(MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            f.write(b"\0" * (-start % ALIGN))
 
-                if prob > max_prob:
-                    max_prob = prob
-                    next_token = token
+            for name in ARRAYS:
+                array = np.ascontiguousarray(getattr(self, name))
+                f.write(array.tobytes())
+                f.write(b"\0" * (-array.nbytes % ALIGN))
 
-        return next_token
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temp_path, path)
 
     def predict_sequence(self, context: tuple, max_length: int = 50) -> list[str]:
-        assert self.counter != None
+        assert self.keys is not None
 
         tokens = list(context)
         max_length -= len(context)
@@ -106,39 +479,96 @@ class SmoothedNGram(NGram):
     N-gram language model with add-k smoothing.
     """
 
-    def __init__(self, n: int, vocab_set: set) -> None:
-        super().__init__(n, vocab_set)
+    def __init__(self, n: int, vocab_set: set, tokens: list[str] | None = None) -> None:
+        super().__init__(n, vocab_set, tokens)
 
         self.V = len(vocab_set)
 
     def get_log_prob(self, token_set: tuple, k: float = 0) -> float:
-        assert self.counter != None
+        assert self.keys is not None
 
-        subset = tuple(token_set[:-1])
+        count = self.get_count(token_set)
+        subset_count = self.get_count(tuple(token_set[:-1]))
 
-        if token_set in self.counter:
-            return math.log2((self.counter[token_set] + k) / (self.counter[subset] + k * self.V))
+        if count > 0:
+            return math.log2((count + k) / (subset_count + k * self.V))
         else:
-            subset_count = 0
+            return math.log2(k / (subset_count + k * self.V))
 
-            if subset in self.counter:
-                subset_count = self.counter[subset]
+    def get_perplexities(self, test_lines: str | Iterable[str], ks: list[float], processes: int = 1, batch_size: int = BATCH_SIZE) -> np.ndarray:
+        """
+        Return the perplexity of test_lines for every k of ks, evaluating test_lines once.
+        """
 
-            return math.log2(k / (subset_count + k * self.V))
+        (counts, frequencies), (context_counts, context_frequencies), N = self.get_histograms(test_lines, processes, batch_size)
+        ks = np.asarray(ks, dtype=np.float64)
+
+        # log2((count + k) / (context count + k * V)) summed over n-grams, as count by k and context count by k grids
+        with np.errstate(divide="ignore"):
+            log_sums = (frequencies[:, None] * np.log2(counts[:, None] + ks)).sum(axis=0)
+            context_log_sums = (context_frequencies[:, None] * np.log2(context_counts[:, None] + ks * self.V)).sum(axis=0)
+
+        # With k of 0, an unseen n-gram has no probability, and an unseen context would make the difference nan
+        np.subtract(log_sums, context_log_sums, out=log_sums, where=log_sums != -np.inf)
+
+        return np.power(2, (-1 / N) * log_sums)
 
     # Override
-    def get_perplexity(self, test_lines: list[str], k: float) -> float:
-        assert self.counter != None
+    def get_perplexity(self, test_lines: str | Iterable[str], k: float, processes: int = 1, batch_size: int = BATCH_SIZE) -> float:
+        return float(self.get_perplexities(test_lines, [k], processes, batch_size)[0])
 
-        log_sum = 0
-        N = 0
 
-        for line in test_lines:
-            tokens = self.tokenize(line)
-            N += len(tokens)
+# The model counting batches in a worker process of count_lines
+worker_model = None
+
+
+def init_worker(model_class: type, n: int, vocab_set: set, tokens: list[str]) -> None:
+    global worker_model
+    worker_model = model_class(n, vocab_set, tokens)
+
+
+def count_batch(lines: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    return worker_model.count(lines)
+
+
+def init_evaluator(model: NGram | str) -> None:
+    global worker_model
+    worker_model = load_ngram(model) if isinstance(model, str) else model
+
+
+def evaluate_batch(lines: list[str]) -> tuple:
+    return worker_model.get_batch_histograms(lines)
+
+
+MODEL_CLASSES = {
+    "NGram": NGram,
+    "SmoothedNGram": SmoothedNGram
+}
+
+
+def load_ngram(path: str) -> NGram:
+    """
+    Load a model saved by NGram.save. Its arrays are read-only views of a memory map of the file,
+    so that loading reads none of them, and processes loading the same file share its pages.
+    """
+
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not an n-gram model: %s" % path)
+
+    length = int.from_bytes(buffer[len(MAGIC) : len(MAGIC) + 8], "little")
+    header = json.loads(buffer[len(MAGIC) + 8 : len(MAGIC) + 8 + length])
+    start = len(MAGIC) + 8 + length
+    start += -start % ALIGN
+
+    tokens = header["tokens"]
+    vocab_set = set(tokens) if header["has_unk"] else set(tokens[1:])
+    model = MODEL_CLASSES[header["class"]](header["n"], vocab_set, tokens)
+    model.path = path
 
-            for i in range(len(tokens) - self.n + 1):
-                token_set = tuple(tokens[i : i + self.n])
-                log_sum += self.get_log_prob(token_set, k)
+    for name, (offset, dtype, count) in header["arrays"].items():
+        setattr(model, name, np.frombuffer(buffer, dtype=dtype, count=count, offset=start + offset) if count > 0 else np.zeros(0, dtype=dtype))
 
-        return pow(2, (-1 / N) * log_sum)
+    return model
@@ -1,18 +1,72 @@
-def build_vocab_set(train_lines: list[str], threshold: int = 3) -> set:
+import itertools
+import multiprocessing
+import os
+from collections import Counter, deque
+from typing import Callable, Iterable, Iterator
+
+# Lines counted together, by one process
+BATCH_SIZE = 20000
+
+
+def read_batches(source: str | Iterable[str], batch_size: int = BATCH_SIZE) -> Iterator[list[str]]:
+    """
+    Yield lists of up to batch_size lines from source, a path to a UTF-8 text file or an iterable of lines,
+    reading lines only as batches are taken.
+    """
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "r", encoding="utf-8") as f:
+            yield from read_batches(f, batch_size)
+
+        return
+
+    lines = iter(source)
+
+    while True:
+        batch = list(itertools.islice(lines, batch_size))
+
+        if len(batch) == 0:
+            return
+
+        yield batch
+
+
+def map_batches(func: Callable, batches: Iterable[list[str]], processes: int, initializer: Callable = None, initargs: tuple = ()) -> Iterator:
     """
-    Build vocabulary from corpus.
+    Yield func(batch) for every batch, in order, from a pool of processes. At most two batches per process are
+    waiting at a time, so that batches are read no faster than they are processed.
+    func and initializer must be defined at module level, and callers guarded by if __name__ == "__main__"
+    on platforms starting processes by spawning.
     """
 
-    counter = {}
+    with multiprocessing.Pool(processes, initializer, initargs) as pool:
+        pending = deque()
+
+        for batch in batches:
+            pending.append(pool.apply_async(func, (batch, )))
+
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().get()
+
+        while len(pending) > 0:
+            yield pending.popleft().get()
+
+
+def count_tokens(lines: list[str]) -> Counter:
+    return Counter(itertools.chain.from_iterable(line.split() for line in lines))
+
+
+def build_vocab_set(train_lines: str | Iterable[str], threshold: int = 3, processes: int = 1, batch_size: int = BATCH_SIZE) -> set:
+    """
+    Build vocabulary from corpus, a path to a text file or an iterable of lines, streamed in batches
+    counted by processes processes.
+    """
 
-    for line in train_lines:
-        tokens = line.strip().split()
+    batches = read_batches(train_lines, batch_size)
+    counter = Counter()
 
-        for token in tokens:
-            if token in counter:
-                counter[token] += 1
-            else:
-                counter[token] = 1
+    for batch_counter in (map_batches(count_tokens, batches, processes) if processes > 1 else map(count_tokens, batches)):
+        counter.update(batch_counter)
 
     vocab_set = set()
 
@@ -0,0 +1,32 @@
+import os
+
+from models.vocab.dictionary import Dictionary, vocab_to_rows
+from models.vocab.vocabulary import Cluster, Vocabulary
+
+FIELDS = ("pronunciation", "meanings", "examples", "synonyms", "antonyms", "related", "audio_source")
+
+
+def get_fields(vocab: Vocabulary) -> dict:
+    return {pos: tuple(getattr(cluster, field) for field in FIELDS) for pos, cluster in vocab.clusters.items()}
+
+
+def test_empty_fields_round_trip_through_csv(tmp_path) -> None:
+    vocab = Vocabulary("zenith")
+    vocab.add_cluster("noun", Cluster("/ˈzen.ɪθ/", ["the highest point"], synonyms=["summit", "peak"]))
+    vocab.add_cluster("verb", Cluster())
+    vocab.get_cluster("verb").add_meaning("to reach the highest point")
+
+    dictionary = Dictionary()
+    dictionary.add_vocab(vocab)
+    path = os.path.join(tmp_path, "dict.csv")
+    dictionary.to_csv(path)
+
+    loaded = Dictionary()
+    loaded.from_csv(path)
+    loaded_vocab = loaded.get_vocab("zenith")
+
+    assert loaded_vocab == vocab
+    assert get_fields(loaded_vocab) == get_fields(vocab)
+    assert vocab_to_rows(loaded_vocab) == vocab_to_rows(vocab)
+    assert vocab.get_cluster("verb").meanings == ("to reach the highest point", )
+    assert vocab.get_cluster("noun").examples == ()
@@ -0,0 +1,130 @@
+import heapq
+import itertools
+import math
+import re
+
+from collections import Counter
+
+# BM25 parameters: term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Words too common to tell documents apart, left out to keep posting lists short
+STOP_WORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "he", "her", "his", "in", "is", "it",
+    "its", "of", "on", "or", "she", "that", "the", "their", "them", "they", "this", "to", "was", "were", "which", "who",
+    "with", "you", "your"
+])
+
+
+def stem(token: str) -> str:
+    """
+    Strip a possessive or plural ending, so that "friends" and "friend's" match "friend".
+    """
+
+    if token.endswith("'s"):
+        return token[:-2]
+
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        if token.endswith("ies") and len(token) > 4:
+            return token[:-3] + "y"
+
+        return token[:-1]
+
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class TextIndex:
+    """
+    An inverted index of documents by their terms, ranking matches by BM25.
+    A query reads the posting lists of its rarest terms. Once no other document can reach the top results with the
+    remaining common terms, those only add to the scores of the documents found so far (the MaxScore strategy),
+    so the cost depends on how rare the query terms are rather than on the number of documents.
+    """
+
+    def __init__(self) -> None:
+        # term -> {key: term frequency}
+        self.postings = {}
+
+        # key -> (term, ...) for removal, and the length of every document
+        self.terms = {}
+        self.lengths = {}
+        self.total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.lengths)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.lengths
+
+    def add(self, key: str, text: str) -> None:
+        """
+        Index text as the document key, replacing the previous document of key.
+        """
+
+        if key in self.lengths:
+            self.remove(key)
+
+        tokens = tokenize(text)
+        counts = Counter(tokens)
+
+        for term, count in counts.items():
+            posting = self.postings.get(term)
+
+            if posting is None:
+                posting = self.postings[term] = {}
+
+            posting[key] = count
+
+        self.terms[key] = tuple(counts)
+        self.lengths[key] = len(tokens)
+        self.total_length += len(tokens)
+
+    def remove(self, key: str) -> None:
+        for term in self.terms.pop(key):
+            posting = self.postings[term]
+            del posting[key]
+
+            if len(posting) == 0:
+                del self.postings[term]
+
+        self.total_length -= self.lengths.pop(key)
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[str, float]]:
+        """
+        Return up to limit (key, score) of the documents matching terms of query, best first.
+        """
+
+        count = len(self.lengths)
+
+        if count == 0:
+            return []
+
+        average_length = max(self.total_length / count, 1)
+        postings = sorted((self.postings[term] for term in set(tokenize(query)) if term in self.postings), key=len)
+        idfs = [math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5)) for posting in postings]
+
+        # The most a document can get from the terms from i on
+        bounds = list(itertools.accumulate(reversed([idf * (K1 + 1) for idf in idfs])))[::-1]
+        scores = {}
+
+        for i, posting in enumerate(postings):
+            idf = idfs[i]
+
+            if len(scores) >= limit and heapq.nlargest(limit, scores.values())[-1] >= bounds[i]:
+                # Documents not found yet cannot make the top results any more
+                items = [(key, posting[key]) for key in scores if key in posting]
+            else:
+                items = posting.items()
+
+            for key, frequency in items:
+                norm = K1 * (1 - B + B * self.lengths[key] / average_length)
+                scores[key] = scores.get(key, 0) + idf * frequency * (K1 + 1) / (frequency + norm)
+
+        return heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
@@ -0,0 +1,178 @@
+from array import array
+from collections import Counter
+from typing import Iterable
+
+# Length of the grams, and the padding marking the start and end of a word
+Q = 3
+PAD = "\0" * (Q - 1)
+
+
+def get_max_distance(word: str, max_distance: int = 2) -> int:
+    """
+    Return the edit distance allowed for word: none below 3 characters and 1 up to 5, as more is noise for short words.
+    """
+
+    if len(word) < 3:
+        return 0
+
+    if len(word) <= 5:
+        return min(max_distance, 1)
+
+    return max_distance
+
+
+def get_grams(word: str) -> list[tuple[str, int]]:
+    """
+    Return the positional grams of word, padded so that every character is in Q grams.
+    """
+
+    padded = PAD + word + PAD
+
+    return [(padded[i:i + Q], i) for i in range(len(padded) - Q + 1)]
+
+
+def get_masks(word: str) -> dict[str, int]:
+    """
+    Return the bit mask of the positions of each character in word, for get_distance.
+    """
+
+    masks = {}
+
+    for i, char in enumerate(word):
+        masks[char] = masks.get(char, 0) | (1 << i)
+
+    return masks
+
+
+def get_distance(word: str, other: str, masks: dict[str, int] | None = None) -> int:
+    """
+    Return the Levenshtein distance between word and other, with the bit-parallel algorithm of Myers.
+    """
+
+    if len(word) == 0:
+        return len(other)
+
+    if masks is None:
+        masks = get_masks(word)
+
+    all_bits = (1 << len(word)) - 1
+    last_bit = 1 << (len(word) - 1)
+    positive = all_bits
+    negative = 0
+    distance = len(word)
+
+    for char in other:
+        eq = masks.get(char, 0)
+        vertical = eq | negative
+        horizontal = (((eq & positive) + positive) ^ positive) | eq
+        horizontal_positive = negative | ~(horizontal | positive)
+        horizontal_negative = positive & horizontal
+
+        if horizontal_positive & last_bit:
+            distance += 1
+        elif horizontal_negative & last_bit:
+            distance -= 1
+
+        horizontal_positive = (horizontal_positive << 1) | 1
+        horizontal_negative <<= 1
+        positive = (horizontal_negative | ~(vertical | horizontal_positive)) & all_bits
+        negative = horizontal_positive & vertical
+
+    return distance
+
+
+class FuzzyIndex:
+    """
+    An index of words for finding the words within a small edit distance of a misspelled one.
+    Each word is indexed by its grams and their positions. A word within distance k shares all but k * Q of the grams
+    of the query at positions shifted by at most k, so only words sharing that many are compared.
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        # Removed words leave None behind until the index is rebuilt
+        self.words = []
+        self.ids = {}
+
+        # gram + chr(position) -> array of word ids, in increasing order
+        self.postings = {}
+
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.ids
+
+    def add(self, word: str) -> None:
+        if word in self.ids:
+            return
+
+        id = len(self.words)
+        self.words.append(word)
+        self.ids[word] = id
+
+        for gram, position in get_grams(word):
+            key = gram + chr(position)
+            posting = self.postings.get(key)
+
+            if posting is None:
+                posting = self.postings[key] = array("i")
+
+            posting.append(id)
+
+    def remove(self, word: str) -> None:
+        id = self.ids.pop(word)
+        self.words[id] = None
+
+        if len(self.words) > 2 * len(self.ids) + 1000:
+            self.rebuild()
+
+    def rebuild(self) -> None:
+        words = [word for word in self.words if word is not None]
+
+        self.words = []
+        self.ids = {}
+        self.postings = {}
+
+        for word in words:
+            self.add(word)
+
+    def search(self, word: str, max_distance: int = 2, limit: int = 5) -> list[str]:
+        """
+        Return up to limit words within max_distance of word, closest first. See get_max_distance for short words.
+        """
+
+        max_distance = get_max_distance(word, max_distance)
+        grams = get_grams(word)
+        threshold = len(grams) - max_distance * Q
+        counter = Counter()
+
+        for gram, position in grams:
+            for shifted in range(max(0, position - max_distance), position + max_distance + 1):
+                posting = self.postings.get(gram + chr(shifted))
+
+                if posting is not None:
+                    counter.update(posting)
+
+        masks = get_masks(word)
+        matches = []
+
+        for id, count in counter.items():
+            if count < threshold:
+                continue
+
+            other = self.words[id]
+
+            if other is None or abs(len(other) - len(word)) > max_distance:
+                continue
+
+            distance = get_distance(word, other, masks)
+
+            if distance <= max_distance:
+                matches.append((distance, abs(len(other) - len(word)), other))
+
+        matches.sort()
+
+        return [other for _, _, other in matches[:limit]]
@@ -0,0 +1,95 @@
+import random
+
+
+class FenwickTree:
+    """
+    A Fenwick tree over non-negative weights, for drawing indexes in proportion to their weight.
+    Updating a weight and drawing an index both take O(log n).
+    """
+
+    def __init__(self, weights: list[float]) -> None:
+        self.weights = list(weights)
+        self.tree = [0.0] + self.weights
+
+        # Sums drift with float updates, so whether any weight is left is counted apart
+        self.positive = sum(1 for weight in self.weights if weight > 0)
+
+        # Build in O(n) by pushing each partial sum to its parent
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+        self.top = 1
+
+        while self.top * 2 <= len(self.weights):
+            self.top *= 2
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    def get(self, index: int) -> float:
+        return self.weights[index]
+
+    def set(self, index: int, weight: float) -> None:
+        delta = weight - self.weights[index]
+        self.positive += (weight > 0) - (self.weights[index] > 0)
+        self.weights[index] = weight
+        i = index + 1
+
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def get_prefix_sum(self, index: int) -> float:
+        """
+        Return the sum of the weights before index.
+        """
+
+        total = 0.0
+        i = index
+
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+
+        return total
+
+    def get_total(self) -> float:
+        return self.get_prefix_sum(len(self.weights))
+
+    def find(self, value: float) -> int:
+        """
+        Return the index whose span of the cumulative weights holds value.
+        """
+
+        index = 0
+        step = self.top
+
+        while step > 0:
+            if index + step < len(self.tree) and self.tree[index + step] <= value:
+                index += step
+                value -= self.tree[index]
+
+            step //= 2
+
+        # Rounding may run past the last index
+        return min(index, len(self.weights) - 1)
+
+    def sample(self, rand: random.Random = random) -> int | None:
+        """
+        Draw an index in proportion to its weight, or None if all weights are zero.
+        """
+
+        if self.positive == 0:
+            return None
+
+        total = self.get_total()
+
+        while True:
+            index = self.find(rand.random() * total)
+
+            # Rounding may land on an index of zero weight next to the drawn one
+            if self.weights[index] > 0:
+                return index
@@ -1,19 +1,23 @@
 from typing import TYPE_CHECKING
 
 from PyQt5 import uic
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QLineEdit, QPushButton, QCheckBox, QListWidget, QListWidgetItem, QStatusBar, QAction, QFileDialog, QMessageBox, QCompleter
+from PyQt5.QtCore import Qt, QThreadPool
+from PyQt5.QtWidgets import QLineEdit, QPushButton, QCheckBox, QListWidget, QListWidgetItem, QStatusBar, QAction, QFileDialog, QMessageBox, QCompleter, QProgressBar
 from PyQt5.QtGui import QFont, QCloseEvent, QIcon
-from playsound import playsound
 
-from api.cambridge import fetch, BASE_URL
-from models.vocab.dictionary import Vocabulary
+from api.cambridge import FetchResult
+from api.importer import DeckImporter, ImportProgress
+from models.vocab.dictionary import Dictionary, Vocabulary
 from windows.window import Window
+from windows.worker import LookupWorker, ImportWorker
 
 
 if TYPE_CHECKING:
     from app import WindowController
 
+# Item data of a "did you mean" suggestion in list_cluster
+SUGGESTION_ROLE = Qt.UserRole + 1
+
 
 class DictionaryWindow(Window):
     """
@@ -41,14 +45,38 @@ class DictionaryWindow(Window):
         self.completer = QCompleter(self.controller.dict.get_words())
         self.line_input.setCompleter(self.completer)
         self.list_cluster.itemClicked.connect(self.play_audio)
+        self.list_cluster.itemClicked.connect(self.search_suggestion)
+
+        # Lookups run on worker threads; only the result of the latest request is shown
+        self.thread_pool = QThreadPool()
+        self.thread_pool.setMaxThreadCount(4)
+        self.request_id = 0
+        self.workers = {}
+        self.import_worker = None
+        self.is_closed = False
+
+        # A word close to saved words is only looked up online when searched again
+        self.suggested_word = None
+
+        # The word of the Vocabulary shown in list_cluster, None while it is empty or shows suggestions
+        self.shown_word = None
+
+        self.progress_search = QProgressBar()
+        self.progress_search.setRange(0, 0)
+        self.progress_search.setMaximumWidth(120)
+        self.progress_search.setTextVisible(False)
+        self.progress_search.hide()
+        self.status_bar.addPermanentWidget(self.progress_search)
 
         # File menu
         self.action_open = self.findChild(QAction, "action_open")
+        self.action_import = self.findChild(QAction, "action_import")
         self.action_save = self.findChild(QAction, "action_save")
         self.action_save_as = self.findChild(QAction, "action_save_as")
         self.action_reset = self.findChild(QAction, "action_reset")
 
         self.action_open.triggered.connect(self.open)
+        self.action_import.triggered.connect(self.import_deck)
         self.action_save.triggered.connect(self.save)
         self.action_save_as.triggered.connect(self.save_as)
         self.action_reset.triggered.connect(self.reset)
@@ -77,42 +105,117 @@ class DictionaryWindow(Window):
         if word == "":
             return
 
+        self.cancel_search()
         vocab = self.controller.dict.get_vocab(word)
 
-        if vocab == None:
-            vocab = fetch(word)
+        if vocab != None:
+            self.show_vocab(vocab)
+            return
+
+        if word != self.suggested_word:
+            suggestions = self.controller.dict.suggest(word)
 
-            if vocab == None:
+            if len(suggestions) > 0:
+                self.suggested_word = word
+                self.show_suggestions(suggestions)
+                self.status_bar.showMessage("Did you mean one of these? Search again to look up %s online" % word)
                 return
 
-            if self.checkbox_learn.isChecked():
-                self.controller.dict.add_vocab(vocab)
-                self.completer.model().setStringList(self.controller.dict.get_words())
+        self.suggested_word = None
+
+        worker = LookupWorker(self.request_id, word, cache=self.controller.cache)
+        worker.signals.finished.connect(self.on_fetched)
+        self.workers[self.request_id] = worker
+        self.thread_pool.start(worker)
 
-                if "list" in self.controller.windows:
-                    self.controller.windows["list"].add_item(vocab.word)
+        self.progress_search.show()
+        self.status_bar.showMessage("Searching %s..." % word)
+
+    def cancel_search(self) -> None:
+        """
+        Drop the pending lookup, if any. A lookup already running is left to finish and its result is ignored.
+        """
+
+        worker = self.workers.get(self.request_id)
+
+        if worker is not None and self.thread_pool.tryTake(worker):
+            del self.workers[self.request_id]
+
+        self.request_id += 1
+
+        self.progress_search.hide()
+
+    def on_fetched(self, request_id: int, result: FetchResult) -> None:
+        self.workers.pop(request_id, None)
+
+        if request_id != self.request_id:
+            return
+
+        self.progress_search.hide()
+
+        if not result.ok:
+            suggestions = self.controller.dict.suggest(result.word)
+
+            if len(suggestions) > 0:
+                self.show_suggestions(suggestions)
+                self.status_bar.showMessage("No result for %s. Did you mean one of these?" % result.word)
+            else:
+                self.status_bar.showMessage("No result for %s" % result.word)
+
+            return
+
+        vocab = result.vocab
+        self.status_bar.clearMessage()
+
+        if self.checkbox_learn.isChecked():
+            self.controller.dict.add_vocab(vocab)
+            self.completer.model().setStringList(self.controller.dict.get_words())
+
+            if "list" in self.controller.windows:
+                self.controller.windows["list"].add_item(vocab.word)
 
         self.show_vocab(vocab)
 
     def clear(self) -> None:
+        self.cancel_search()
         self.list_cluster.clear()
+        self.shown_word = None
         self.line_input.setText("")
 
     def remove(self) -> None:
-        if self.list_cluster.count() == 0:
+        word = self.shown_word
+
+        if word is None:
             return
 
-        word = self.list_cluster.item(0).text()
         self.controller.dict.remove_word(word)
         self.completer.model().setStringList(self.controller.dict.get_words())
 
         self.list_cluster.clear()
+        self.shown_word = None
         self.line_input.setText("")
 
         if "list" in self.controller.windows:
             window_list = self.controller.windows["list"]
             window_list.remove_item(word)
 
+    def show_suggestions(self, suggestions: list[str]) -> None:
+        self.list_cluster.clear()
+        self.shown_word = None
+
+        for suggestion in suggestions:
+            item = QListWidgetItem()
+            item.setText(suggestion)
+            item.setData(SUGGESTION_ROLE, suggestion)
+            self.list_cluster.addItem(item)
+
+    def search_suggestion(self, item: QListWidgetItem) -> None:
+        suggestion = item.data(SUGGESTION_ROLE)
+
+        if suggestion != None:
+            self.line_input.setText(suggestion)
+            self.search()
+
     def show_vocab(self, vocab: Vocabulary) -> None:
         font = QFont()
         font.setBold(True)
@@ -123,6 +226,8 @@ class DictionaryWindow(Window):
 
         self.list_cluster.clear()
         self.list_cluster.addItem(item)
+        self.shown_word = vocab.word
+        self.controller.audio.prefetch(cluster.audio_source for cluster in vocab.clusters.values())
 
         for pos, cluster in vocab.clusters.items():
             pronunciation = cluster.pronunciation
@@ -159,32 +264,80 @@ class DictionaryWindow(Window):
             item.setData(Qt.UserRole, audio_source)
             self.list_cluster.addItem(item)
 
-        self.controller.dict.sort()
-
     def open(self) -> None:
         dialog = QFileDialog()
         dialog.setDefaultSuffix("csv")
-        file_name, _ = dialog.getOpenFileName(self, "Open", "", "CSV (*.csv)")
+        file_name, _ = dialog.getOpenFileName(self, "Open", "", "Dictionary (*.csv *.db)")
 
         if file_name:
-            self.controller.dict.reset()
-            self.controller.dict.from_csv(file_name)
-
+            self.controller.open_dict(file_name)
             self.completer.model().setStringList(self.controller.dict.get_words())
-            self.controller.dict_path = file_name
+
+            if "list" in self.controller.windows:
+                self.controller.windows["list"].reset_list()
+
+    def import_deck(self) -> None:
+        if self.import_worker is not None:
+            return
+
+        dialog = QFileDialog()
+        file_name, _ = dialog.getOpenFileName(self, "Import", "", "Deck (*.csv *.txt)")
+
+        if not file_name:
+            return
+
+        # Fetched words are staged apart from the dictionary and merged on the GUI thread when done
+        importer = DeckImporter(Dictionary(), self.controller.dict_path + ".import", cache=self.controller.cache, known=self.controller.dict.get_words())
+        self.import_worker = ImportWorker(importer, file_name)
+        self.import_worker.signals.progress.connect(self.on_import_progress)
+        self.import_worker.signals.finished.connect(self.on_imported)
+        self.import_worker.signals.failed.connect(self.on_import_failed)
+        self.thread_pool.start(self.import_worker)
+
+        self.status_bar.showMessage("Importing %s..." % file_name)
+
+    def on_import_progress(self, progress: ImportProgress) -> None:
+        self.status_bar.showMessage("Importing %d/%d words, %d failed, ETA %ds" % (progress.done, progress.total, progress.failed, progress.eta))
+
+    def on_imported(self, progress: ImportProgress) -> None:
+        importer = self.import_worker.importer
+        self.import_worker = None
+
+        # Stopped by closing the window; the words fetched are kept in the checkpoint for the next import
+        if self.is_closed:
+            return
+
+        self.controller.dict.add_vocabs(importer.dict.get_vocabs())
+
+        self.completer.model().setStringList(self.controller.dict.get_words())
+
+        if "list" in self.controller.windows:
+            self.controller.windows["list"].reset_list()
+
+        self.save()
+
+        if progress.done == progress.total:
+            importer.clear_checkpoint()
+
+        self.status_bar.showMessage("Imported %d words, %d failed" % (progress.added, progress.failed))
+
+    def on_import_failed(self, message: str) -> None:
+        self.import_worker = None
+
+        if not self.is_closed:
+            self.status_bar.showMessage("Import failed: %s" % message)
 
     def save(self) -> None:
-        self.controller.dict.to_csv(self.controller.dict_path)
+        self.controller.dict.save(self.controller.dict_path)
         self.status_bar.showMessage("File saved to %s" % self.controller.dict_path)
 
     def save_as(self) -> None:
         dialog = QFileDialog()
         dialog.setDefaultSuffix("csv")
-        file_name, _ = dialog.getSaveFileName(self, "Save", "", "CSV (*.csv)")
+        file_name, _ = dialog.getSaveFileName(self, "Save", "", "CSV (*.csv);;Database (*.db)")
 
         if file_name:
-            self.controller.dict.to_csv(file_name)
-            self.controller.dict_path = file_name
+            self.controller.save_dict_as(file_name)
             self.status_bar.showMessage("File saved to %s" % file_name)
 
     def reset(self) -> None:
@@ -203,6 +356,7 @@ class DictionaryWindow(Window):
         self.status_bar.showMessage("Dictionary reset")
 
         self.list_cluster.clear()
+        self.shown_word = None
         self.completer = QCompleter(self.controller.dict.get_words())
         self.line_input.setCompleter(self.completer)
         self.line_input.setText("")
@@ -226,9 +380,19 @@ class DictionaryWindow(Window):
         audio_source = item.data(Qt.UserRole)
 
         if audio_source != None:
-            playsound(BASE_URL + audio_source)
+            self.controller.audio.play(audio_source)
 
     # Override
     def closeEvent(self, close_event: QCloseEvent) -> None:
+        self.is_closed = True
+        self.cancel_search()
+
+        if self.import_worker is not None:
+            self.import_worker.importer.stop()
+
+        # Running lookups write to the cache, which the controller closes with the last window
+        self.thread_pool.clear()
+        self.thread_pool.waitForDone()
+
         self.save()
         return super().closeEvent(close_event)
@@ -3,10 +3,8 @@ from typing import TYPE_CHECKING
 from PyQt5 import uic
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QPushButton, QListWidget, QListWidgetItem, QProgressBar
-from PyQt5.QtGui import QFont
-from playsound import playsound
+from PyQt5.QtGui import QFont, QCloseEvent
 
-from api.cambridge import BASE_URL
 from models.vocab.flashcard import FlashCard
 from windows.window import Window
 
@@ -23,7 +21,7 @@ class FlashCardWindow(Window):
         super(FlashCardWindow, self).__init__(controller, window_id)
         uic.loadUi("ui/flashcard.ui", self)
 
-        self.flashcard = FlashCard(self.controller.dict)
+        self.flashcard = FlashCard(self.controller.dict, self.controller.get_review_path(), weighted=self.controller.is_weighted())
         self.vocab = self.flashcard.get_next_vocab()
 
         # Widgets
@@ -46,6 +44,10 @@ class FlashCardWindow(Window):
         self.show_vocab()
 
     def progress(self, is_learn: bool) -> None:
+        if self.vocab is None:
+            self.close()
+            return
+
         if is_learn:
             self.flashcard.learn(self.vocab)
         else:
@@ -59,6 +61,10 @@ class FlashCardWindow(Window):
         self.show_vocab()
         self.progress_learned.setValue(len(self.flashcard.learned))
 
+    def closeEvent(self, close_event: QCloseEvent) -> None:
+        self.flashcard.close()
+        return super().closeEvent(close_event)
+
     def show_vocab(self) -> None:
         if self.vocab is None:
             return
@@ -72,6 +78,7 @@ class FlashCardWindow(Window):
 
         self.list_cluster.clear()
         self.list_cluster.addItem(item)
+        self.controller.audio.prefetch(cluster.audio_source for cluster in self.vocab.clusters.values())
 
         for pos, cluster in self.vocab.clusters.items():
             pronunciation = cluster.pronunciation
@@ -112,4 +119,4 @@ class FlashCardWindow(Window):
         audio_source = item.data(Qt.UserRole)
 
         if audio_source != None:
-            playsound(BASE_URL + audio_source)
+            self.controller.audio.play(audio_source)
@@ -2,14 +2,16 @@ from typing import TYPE_CHECKING
 
 from PyQt5 import uic
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QLineEdit, QListWidget, QListWidgetItem
+from PyQt5.QtWidgets import QLineEdit, QCheckBox, QListWidget, QListWidgetItem
 
-from utils.search import bisect_left
 from windows.window import Window
 
 if TYPE_CHECKING:
     from app import WindowController
 
+# Number of words listed by a search by meaning
+RANKED_LIMIT = 50
+
 
 class ListWindow(Window):
     """
@@ -22,17 +24,16 @@ class ListWindow(Window):
 
         # Widgets
         self.line_input = self.findChild(QLineEdit, "line_input")
+        self.checkbox_meaning = self.findChild(QCheckBox, "checkbox_meaning")
         self.list_vocab = self.findChild(QListWidget, "list_vocab")
 
         self.line_input.returnPressed.connect(self.search)
         self.line_input.textChanged.connect(self.search)
+        self.checkbox_meaning.toggled.connect(self.search)
         self.list_vocab.itemDoubleClicked.connect(self.view_vocab)
 
-        for vocab in self.controller.dict.get_vocabs():
-            item = QListWidgetItem()
-            item.setData(Qt.UserRole, vocab)
-            item.setText(vocab.word)
-            self.list_vocab.addItem(item)
+        # Only words are listed, so that a lazily loaded dictionary is not parsed in full
+        self.list_vocab.addItems(self.controller.dict.get_words())
 
         # Window settings
         self.setWindowFlags(Qt.WindowStaysOnTopHint)
@@ -50,22 +51,52 @@ class ListWindow(Window):
 
         self.list_vocab.clear()
 
-        for vocab in self.controller.dict.get_vocabs_by_prefix(word):
-            item = QListWidgetItem()
-            item.setData(Qt.UserRole, vocab)
-            item.setText(vocab.word)
-            self.list_vocab.addItem(item)
+        if self.is_ranked():
+            self.list_vocab.addItems(self.controller.dict.search_text(word, RANKED_LIMIT))
+        else:
+            self.list_vocab.addItems(self.controller.dict.get_words_by_prefix(word))
+
+    def is_ranked(self) -> bool:
+        """
+        Whether the list holds the best matches of a search by meaning, instead of sorted words.
+        """
+
+        return self.checkbox_meaning.isChecked() and self.line_input.text() != ""
+
+    def find_row(self, word: str) -> int:
+        """
+        Return the leftmost row of word in the sorted list.
+        """
+
+        left = 0
+        right = self.list_vocab.count()
+
+        while left < right:
+            mid = left + (right - left) // 2
+
+            if self.list_vocab.item(mid).text() < word:
+                left = mid + 1
+            else:
+                right = mid
+
+        return left
 
     def add_item(self, word: str) -> None:
-        item = QListWidgetItem()
-        item.setData(Qt.UserRole, self.controller.dict.get_vocab(word))
-        item.setText(word)
-        self.list_vocab.addItem(item)
-        self.list_vocab.sortItems()
+        if self.is_ranked():
+            self.search()
+            return
+
+        self.list_vocab.insertItem(self.find_row(word), word)
 
     def remove_item(self, word: str) -> None:
-        left = bisect_left(self.controller.dict.get_words(), word)
-        self.list_vocab.takeItem(left)
+        if self.is_ranked():
+            self.search()
+            return
+
+        row = self.find_row(word)
+
+        if row < self.list_vocab.count() and self.list_vocab.item(row).text() == word:
+            self.list_vocab.takeItem(row)
 
     def clear_item(self) -> None:
         self.list_vocab.clear()
@@ -73,8 +104,4 @@ class ListWindow(Window):
     def reset_list(self) -> None:
         self.clear_item()
 
-        for vocab in self.controller.dict.get_vocabs():
-            item = QListWidgetItem()
-            item.setData(Qt.UserRole, vocab)
-            item.setText(vocab.word)
-            self.list_vocab.addItem(item)
+        self.list_vocab.addItems(self.controller.dict.get_words())
@@ -0,0 +1,69 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+from api.cache import LookupCache
+from api.cambridge import fetch_result
+from api.importer import DeckImporter
+
+
+class LookupSignals(QObject):
+    """
+    Signals of LookupWorker. QRunnable is not a QObject and cannot emit by itself.
+    """
+
+    finished = pyqtSignal(int, object)
+
+
+class LookupWorker(QRunnable):
+    """
+    A worker for looking up a word off the GUI thread. Emits finished with its request id and FetchResult.
+    """
+
+    def __init__(self, request_id: int, word: str, trans: str = "english", cache: LookupCache | None = None) -> None:
+        super(LookupWorker, self).__init__()
+
+        self.request_id = request_id
+        self.word = word
+        self.trans = trans
+        self.cache = cache
+        self.signals = LookupSignals()
+
+        # Kept alive by the window until finished, so that tryTake can still cancel it
+        self.setAutoDelete(False)
+
+    def run(self) -> None:
+        result = fetch_result(self.word, self.trans, self.cache)
+        self.signals.finished.emit(self.request_id, result)
+
+
+class ImportSignals(QObject):
+    """
+    Signals of ImportWorker.
+    """
+
+    progress = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class ImportWorker(QRunnable):
+    """
+    A worker for importing a deck off the GUI thread. Emits progress with each ImportProgress, and finished at the end,
+    or failed with the error if the import raised.
+    """
+
+    def __init__(self, importer: DeckImporter, deck_path: str) -> None:
+        super(ImportWorker, self).__init__()
+
+        self.importer = importer
+        self.deck_path = deck_path
+        self.signals = ImportSignals()
+        self.importer.callback = self.signals.progress.emit
+        self.setAutoDelete(False)
+
+    def run(self) -> None:
+        try:
+            progress = self.importer.run(self.deck_path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(progress)